@@ -1,10 +1,15 @@
 """
 Audit logging middleware for automatic API tracking.
 """
+from functools import lru_cache
+
 from django.contrib.contenttypes.models import ContentType
 
+from . import writer
 from .models import AuditAction, AuditLog
 
+USER_AGENT_MAX_LENGTH = 500  # max_length of the user_agent columns
+
 
 class AuditLogMiddleware:
     """
@@ -12,8 +17,11 @@ class AuditLogMiddleware:
     Tracks: POST, PUT, PATCH, DELETE on /api/ endpoints.
     """
     
-    AUDITABLE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
-    AUDITABLE_PATHS = ["/api/"]
+    AUDITABLE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+    AUDITABLE_PATHS = ("/api/",)  # Tuple so str.startswith can match all prefixes at once
+    # High-volume endpoints whose writes are not audit-worthy (heartbeat auto-save)
+    EXCLUDED_PATH_SUFFIXES = ("/partial/",)
+    UPDATE_METHODS = frozenset({"PUT", "PATCH"})
     
     def __init__(self, get_response):
         self.get_response = get_response
@@ -21,18 +29,24 @@ class AuditLogMiddleware:
     def __call__(self, request):
         response = self.get_response(request)
         
-        # Only audit specific methods on API paths
+        # Only audit specific methods on API paths; method check first since it is cheapest
         if (
             request.method in self.AUDITABLE_METHODS
-            and any(request.path.startswith(p) for p in self.AUDITABLE_PATHS)
+            and request.path.startswith(self.AUDITABLE_PATHS)
             and response.status_code < 400  # Only successful requests
+            and not request.path.endswith(self.EXCLUDED_PATH_SUFFIXES)
+            and not getattr(request, "_audit_skip", False)
         ):
+            changes = getattr(request, "_audit_changes", None)
+            # Views that report their diff let no-op updates skip the audit row
+            if changes is not None and not changes and request.method in self.UPDATE_METHODS:
+                return response
             self._create_audit_log(request, response)
         
         return response
     
     def _create_audit_log(self, request, response):
-        """Create an audit log entry for the request."""
+        """Queue an audit log entry for the request."""
         action_map = {
             "POST": AuditAction.CREATE,
             "PUT": AuditAction.UPDATE,
@@ -41,24 +55,68 @@ class AuditLogMiddleware:
         }
         
         try:
-            AuditLog.objects.create(
+            ip_address, user_agent = get_client_info(request)
+            writer.enqueue(AuditLog(
                 action=action_map.get(request.method, AuditAction.UPDATE),
                 user=request.user if request.user.is_authenticated else None,
-                ip_address=self._get_client_ip(request),
-                user_agent=request.META.get("HTTP_USER_AGENT", "")[:500],
+                ip_address=ip_address,
+                user_agent=user_agent,
                 request_path=request.path[:500],
                 request_method=request.method,
-            )
+                changes=getattr(request, "_audit_changes", None) or {},
+            ))
         except Exception:
             # Don't let audit logging break the request
             pass
-    
-    def _get_client_ip(self, request):
-        """Extract client IP from request headers."""
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            return x_forwarded_for.split(",")[0].strip()
-        return request.META.get("REMOTE_ADDR")
+
+
+def get_client_ip(request):
+    """Extract the client IP, preferring the first X-Forwarded-For hop."""
+    return _client_ip(request.META)
+
+
+def get_client_info(request) -> tuple:
+    """
+    (client IP, user agent) for audit and response rows, read from a single
+    request.META binding; DRF's Request proxies META through __getattr__.
+    """
+    meta = request.META
+    user_agent = meta.get("HTTP_USER_AGENT", "")
+    if len(user_agent) > USER_AGENT_MAX_LENGTH:
+        user_agent = user_agent[:USER_AGENT_MAX_LENGTH]
+    return _client_ip(meta), user_agent
+
+
+def _client_ip(meta):
+    """Uses str.partition so only the first hop is sliced out of the header."""
+    x_forwarded_for = meta.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        return x_forwarded_for.partition(",")[0].strip()
+    return meta.get("REMOTE_ADDR")
+
+
+def _underlying_request(request):
+    """Return the Django HttpRequest seen by middleware (unwrapping DRF's Request)."""
+    return getattr(request, "_request", request)
+
+
+def skip_audit(request):
+    """Mark a request so AuditLogMiddleware does not log it (e.g. the view logs it itself)."""
+    _underlying_request(request)._audit_skip = True
+
+
+def set_audit_changes(request, changes: dict):
+    """
+    Report the changes made by a view to AuditLogMiddleware.
+    An empty dict on PUT/PATCH marks the request as a no-op and skips the audit row.
+    """
+    _underlying_request(request)._audit_changes = changes
+
+
+@lru_cache(maxsize=512)
+def _content_type_id_for(model_cls) -> int:
+    """Process-local ContentType id lookup, keyed on the model class."""
+    return ContentType.objects.get_for_model(model_cls).pk
 
 
 def log_audit_event(
@@ -72,12 +130,13 @@ def log_audit_event(
     """
     Utility function to create audit log entries programmatically.
     Use this for custom audit events not captured by middleware.
+    The entry is queued for a batched write; the unsaved instance is returned.
     """
-    content_type = None
+    content_type_id = None
     object_id = ""
     
     if obj:
-        content_type = ContentType.objects.get_for_model(obj)
+        content_type_id = _content_type_id_for(type(obj))
         object_id = str(obj.pk)
     
     ip_address = None
@@ -86,18 +145,14 @@ def log_audit_event(
     request_method = ""
     
     if request:
-        ip_address = (
-            request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")[0].strip()
-            or request.META.get("REMOTE_ADDR")
-        )
-        user_agent = request.META.get("HTTP_USER_AGENT", "")[:500]
+        ip_address, user_agent = get_client_info(request)
         request_path = request.path[:500]
         request_method = request.method
     
-    return AuditLog.objects.create(
+    entry = AuditLog(
         action=action,
         user=user,
-        content_type=content_type,
+        content_type_id=content_type_id,
         object_id=object_id,
         changes=changes or {},
         description=description,
@@ -106,3 +161,5 @@ def log_audit_event(
         request_path=request_path,
         request_method=request_method,
     )
+    writer.enqueue(entry)
+    return entry
@@ -0,0 +1,98 @@
+"""
+Convert audit_logs into a table range-partitioned by month on "timestamp".
+
+PostgreSQL requires the partition key in every unique constraint, so the
+database primary key becomes (id, timestamp); Django keeps treating "id"
+as the primary key. Monthly partitions are created by
+audit_logs_ensure_partition(), called here for existing data and ahead of
+time by the apps.audit.tasks.ensure_audit_log_partitions beat task. A
+DEFAULT partition catches rows for months that have no partition yet.
+"""
+from django.db import migrations
+
+INDEXES_SQL = """
+CREATE INDEX audit_logs_user_id_73c422_idx ON audit_logs (user_id);
+CREATE INDEX audit_logs_action_31f574_idx ON audit_logs (action);
+CREATE INDEX audit_logs_timesta_423be6_idx ON audit_logs ("timestamp");
+CREATE INDEX audit_obj_ts_idx ON audit_logs (content_type_id, object_id, "timestamp" DESC);
+"""
+
+FOREIGN_KEYS_SQL = """
+ALTER TABLE audit_logs
+    ADD CONSTRAINT audit_logs_user_id_fk_users_id
+    FOREIGN KEY (user_id) REFERENCES users (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE audit_logs
+    ADD CONSTRAINT audit_logs_content_type_id_fk_django_content_type_id
+    FOREIGN KEY (content_type_id) REFERENCES django_content_type (id) DEFERRABLE INITIALLY DEFERRED;
+"""
+
+PARTITION_SQL = """
+CREATE OR REPLACE FUNCTION audit_logs_ensure_partition(month_start date) RETURNS void AS $$
+DECLARE
+    start_date date := date_trunc('month', month_start)::date;
+    end_date date := (date_trunc('month', month_start) + interval '1 month')::date;
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+        'audit_logs_' || to_char(start_date, 'YYYY_MM'), start_date, end_date
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE audit_logs RENAME TO audit_logs_legacy;
+
+CREATE TABLE audit_logs (
+    LIKE audit_logs_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE ("timestamp");
+ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey_partitioned PRIMARY KEY (id, "timestamp");
+CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+DO $$
+DECLARE
+    cur_month date := date_trunc('month', COALESCE((SELECT min("timestamp") FROM audit_logs_legacy), now()))::date;
+BEGIN
+    WHILE cur_month <= date_trunc('month', now() + interval '1 month') LOOP
+        PERFORM audit_logs_ensure_partition(cur_month);
+        cur_month := (cur_month + interval '1 month')::date;
+    END LOOP;
+END;
+$$;
+
+INSERT INTO audit_logs SELECT * FROM audit_logs_legacy;
+DROP TABLE audit_logs_legacy;
+""" + INDEXES_SQL + FOREIGN_KEYS_SQL
+
+UNPARTITION_SQL = """
+ALTER TABLE audit_logs RENAME TO audit_logs_partitioned;
+
+CREATE TABLE audit_logs (
+    LIKE audit_logs_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+);
+ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id);
+
+INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned;
+DROP TABLE audit_logs_partitioned;
+DROP FUNCTION IF EXISTS audit_logs_ensure_partition(date);
+""" + INDEXES_SQL + FOREIGN_KEYS_SQL
+
+
+def partition_audit_logs(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(PARTITION_SQL, params=None)
+
+
+def unpartition_audit_logs(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(UNPARTITION_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0002_auditlog_audit_obj_ts_idx"),
+        ("users", "0002_organization_and_update_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_logs, unpartition_audit_logs),
+    ]
@@ -0,0 +1,55 @@
+"""
+Enforce audit log immutability in the database.
+
+Rejects UPDATE and DELETE on audit_logs with a row-level trigger, so raw
+SQL writes are blocked as well as ORM ones. The one permitted UPDATE is
+the ON DELETE SET NULL cascade from users/content types nulling out
+user_id or content_type_id with every other column unchanged.
+"""
+from django.db import migrations
+
+CREATE_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION audit_logs_immutable() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+        AND (NEW.user_id IS NULL OR NEW.user_id = OLD.user_id)
+        AND (NEW.content_type_id IS NULL OR NEW.content_type_id = OLD.content_type_id)
+        AND (to_jsonb(NEW) - 'user_id' - 'content_type_id')
+            = (to_jsonb(OLD) - 'user_id' - 'content_type_id')
+    THEN
+        RETURN NEW;
+    END IF;
+    RAISE EXCEPTION 'Audit logs are immutable and cannot be %', lower(TG_OP) || 'd';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER audit_logs_immutable
+    BEFORE UPDATE OR DELETE ON audit_logs
+    FOR EACH ROW EXECUTE FUNCTION audit_logs_immutable();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS audit_logs_immutable ON audit_logs;
+DROP FUNCTION IF EXISTS audit_logs_immutable();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_TRIGGER_SQL, params=None)
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_TRIGGER_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0003_partition_audit_logs"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
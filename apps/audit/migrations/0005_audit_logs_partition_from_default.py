@@ -0,0 +1,91 @@
+"""
+Let audit_logs_ensure_partition() create a month that already has rows
+in the DEFAULT partition.
+
+PostgreSQL refuses to attach a range partition while DEFAULT holds rows
+in that range, so a month that missed its partition could never get one.
+When that happens the function now detaches DEFAULT, creates the month's
+partition and a fresh DEFAULT, re-routes the old DEFAULT's rows through
+audit_logs and drops it. Dropping the detached table rather than deleting
+from it keeps the immutability trigger (migration 0004) out of the way.
+The function returns how many rows it re-routed.
+"""
+from django.db import migrations
+
+ENSURE_PARTITION_SQL = """
+DROP FUNCTION IF EXISTS audit_logs_ensure_partition(date);
+
+CREATE FUNCTION audit_logs_ensure_partition(month_start date) RETURNS integer AS $$
+DECLARE
+    start_date date := date_trunc('month', month_start)::date;
+    end_date date := (date_trunc('month', month_start) + interval '1 month')::date;
+    partition_name text := 'audit_logs_' || to_char(start_date, 'YYYY_MM');
+    moved integer;
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN 0;
+    END IF;
+
+    LOCK TABLE audit_logs IN ACCESS EXCLUSIVE MODE;
+    IF NOT EXISTS (
+        SELECT 1 FROM audit_logs_default
+        WHERE "timestamp" >= start_date AND "timestamp" < end_date
+    ) THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+            partition_name, start_date, end_date
+        );
+        RETURN 0;
+    END IF;
+
+    ALTER TABLE audit_logs DETACH PARTITION audit_logs_default;
+    ALTER TABLE audit_logs_default RENAME TO audit_logs_default_detached;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_date, end_date
+    );
+    CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
+    INSERT INTO audit_logs SELECT * FROM audit_logs_default_detached;
+    GET DIAGNOSTICS moved = ROW_COUNT;
+    DROP TABLE audit_logs_default_detached;
+    RETURN moved;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_ENSURE_PARTITION_SQL = """
+DROP FUNCTION IF EXISTS audit_logs_ensure_partition(date);
+
+CREATE FUNCTION audit_logs_ensure_partition(month_start date) RETURNS void AS $$
+DECLARE
+    start_date date := date_trunc('month', month_start)::date;
+    end_date date := (date_trunc('month', month_start) + interval '1 month')::date;
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+        'audit_logs_' || to_char(start_date, 'YYYY_MM'), start_date, end_date
+    );
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def replace_ensure_partition(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(ENSURE_PARTITION_SQL, params=None)
+
+
+def restore_ensure_partition(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(PREVIOUS_ENSURE_PARTITION_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_audit_logs_immutable_trigger"),
+    ]
+
+    operations = [
+        migrations.RunPython(replace_ensure_partition, restore_ensure_partition),
+    ]
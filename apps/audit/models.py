@@ -2,6 +2,7 @@
 AuditLog model for compliance tracking.
 Maps to Security & Compliance: Audit Trail requirement.
 """
+import json
 import uuid
 
 from django.conf import settings
@@ -26,6 +27,9 @@ class AuditLog(models.Model):
     """
     Immutable audit log for tracking RBAC actions and edits.
     Every API hit that modifies a survey or accesses PII is logged.
+    
+    On PostgreSQL the table is range-partitioned by month on timestamp
+    (see migration 0003), so old months can be dropped for retention.
     """
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -66,6 +70,9 @@ class AuditLog(models.Model):
     # Timestamp (immutable)
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    # Upper bound on the serialized size of changes, to keep audit rows small
+    MAX_CHANGES_BYTES = 64 * 1024
+    
     class Meta:
         db_table = "audit_logs"
         ordering = ["-timestamp"]
@@ -73,20 +80,40 @@ class AuditLog(models.Model):
             models.Index(fields=["user"]),
             models.Index(fields=["action"]),
             models.Index(fields=["timestamp"]),
-            models.Index(fields=["content_type", "object_id"]),
+            # Object history, newest first; also serves (content_type, object_id) lookups
+            models.Index(
+                fields=["content_type", "object_id", "-timestamp"],
+                name="audit_obj_ts_idx",
+            ),
         ]
-        # Make table effectively append-only at application level
-        # (true immutability requires DB-level triggers)
+        # Append-only: enforced in save()/delete() and, on PostgreSQL,
+        # by the audit_logs_immutable trigger (see migration 0004)
     
     def __str__(self):
         return f"{self.action} by {self.user} at {self.timestamp}"
     
     def save(self, *args, **kwargs):
         """Prevent updates to existing audit logs."""
-        if self.pk and AuditLog.objects.filter(pk=self.pk).exists():
+        if not self._state.adding:
             raise ValueError("Audit logs are immutable and cannot be updated")
+        self.bound_changes()
         super().save(*args, **kwargs)
     
+    def bound_changes(self):
+        """
+        Replace an oversized changes payload with a truncated summary.
+        Called from save() and before bulk inserts, which bypass save().
+        """
+        if not self.changes:
+            return
+        size = len(json.dumps(self.changes, default=str))
+        if size > self.MAX_CHANGES_BYTES:
+            self.changes = {
+                "_truncated": True,
+                "_original_size": size,
+                "_summary": list(self.changes)[:20],
+            }
+    
     def delete(self, *args, **kwargs):
         """Prevent deletion of audit logs."""
         raise ValueError("Audit logs are immutable and cannot be deleted")
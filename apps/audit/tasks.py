@@ -0,0 +1,41 @@
+"""
+Celery tasks for audit log maintenance.
+"""
+import logging
+from datetime import date
+
+from celery import shared_task
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def ensure_audit_log_partitions(months_ahead: int = 2):
+    """
+    Pre-create monthly audit_logs partitions so new rows never land in the
+    DEFAULT partition. Scheduled via Celery beat.
+    
+    Rows already in DEFAULT for one of these months are moved into the new
+    partition; anything left in DEFAULT afterwards is logged as a warning.
+    """
+    if connection.vendor != "postgresql":
+        return
+    
+    today = date.today()
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            year, month = divmod(today.month - 1 + offset, 12)
+            month_start = date(today.year + year, month + 1, 1)
+            cursor.execute("SELECT audit_logs_ensure_partition(%s)", [month_start])
+            moved = cursor.fetchone()[0]
+            if moved:
+                logger.warning(
+                    "Re-routed %d audit log rows out of the DEFAULT partition to create %s",
+                    moved, month_start.strftime("%Y-%m"),
+                )
+        
+        cursor.execute("SELECT count(*) FROM audit_logs_default")
+        stranded = cursor.fetchone()[0]
+    if stranded:
+        logger.warning("%d audit log rows are in the DEFAULT partition", stranded)
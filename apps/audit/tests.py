@@ -0,0 +1,162 @@
+"""
+Tests for audit logging.
+Maps to Security & Compliance: Audit Trail requirement.
+"""
+import pytest
+
+from apps.audit import writer
+from apps.audit.middleware import log_audit_event
+from apps.audit.models import AuditAction, AuditLog
+
+
+@pytest.mark.django_db
+class TestAuditLogImmutability:
+    """Test audit logs cannot be changed once written."""
+    
+    def test_save_existing_log_raises(self):
+        entry = AuditLog.objects.create(action=AuditAction.CREATE)
+        entry = AuditLog.objects.get(id=entry.id)
+        entry.description = "tampered"
+        
+        with pytest.raises(ValueError):
+            entry.save()
+    
+    def test_queryset_update_blocked_by_database(self):
+        from django.db import DatabaseError, transaction
+        
+        entry = AuditLog.objects.create(action=AuditAction.CREATE)
+        
+        with pytest.raises(DatabaseError), transaction.atomic():
+            AuditLog.objects.filter(id=entry.id).update(description="tampered")
+    
+    def test_user_delete_nulls_audit_user(self, admin_user):
+        entry = AuditLog.objects.create(action=AuditAction.LOGIN, user=admin_user)
+        
+        admin_user.delete()
+        
+        assert AuditLog.objects.get(id=entry.id).user is None
+
+
+@pytest.mark.django_db
+class TestAuditLogChanges:
+    """Test the size bound on audit change payloads."""
+    
+    def test_oversized_changes_are_truncated(self):
+        changes = {f"field{i}": "x" * 1024 for i in range(100)}
+        
+        entry = log_audit_event(action=AuditAction.UPDATE, changes=changes)
+        entry = AuditLog.objects.get(id=entry.id)
+        
+        assert entry.changes["_truncated"] is True
+        assert entry.changes["_summary"] == [f"field{i}" for i in range(20)]
+    
+    def test_small_changes_are_kept(self):
+        changes = {"title": {"old": "A", "new": "B"}}
+        
+        entry = log_audit_event(action=AuditAction.UPDATE, changes=changes)
+        
+        assert AuditLog.objects.get(id=entry.id).changes == changes
+
+
+@pytest.mark.django_db
+class TestAuditLogMiddleware:
+    """Test which requests the middleware records."""
+    
+    def test_noop_patch_is_not_logged(self, authenticated_client, sample_survey):
+        response = authenticated_client.patch(
+            f"/api/v1/surveys/{sample_survey.id}/",
+            {"title": sample_survey.title},
+            format="json"
+        )
+        
+        assert response.status_code == 200
+        assert not AuditLog.objects.filter(request_method="PATCH").exists()
+    
+    def test_patch_records_changes(self, authenticated_client, sample_survey):
+        authenticated_client.patch(
+            f"/api/v1/surveys/{sample_survey.id}/",
+            {"title": "Renamed"},
+            format="json"
+        )
+        
+        entry = AuditLog.objects.get(request_method="PATCH")
+        assert entry.changes == {"title": {"old": "Sample Survey", "new": "Renamed"}}
+    
+    def test_partial_save_is_not_logged(self, api_client, sample_survey):
+        response = api_client.post(
+            f"/api/v1/surveys/{sample_survey.id}/partial/",
+            {"data": {"field1": "value"}},
+            format="json"
+        )
+        
+        assert response.status_code == 201
+        assert not AuditLog.objects.exists()
+
+
+@pytest.mark.django_db
+class TestAuditWriter:
+    """Test the batched audit log writer."""
+    
+    def test_synchronous_mode_writes_immediately(self):
+        entry = log_audit_event(action=AuditAction.EXPORT, description="export")
+        
+        assert AuditLog.objects.filter(id=entry.id).exists()
+    
+    def test_flush_writes_queued_entries(self, settings, mocker):
+        settings.AUDIT_ASYNC_WRITES = True
+        mocker.patch.object(writer, "_ensure_writer")
+        mocker.patch.object(writer, "close_old_connections")
+        
+        entry = log_audit_event(action=AuditAction.EXPORT, description="queued")
+        assert not AuditLog.objects.filter(id=entry.id).exists()
+        
+        writer.flush()
+        
+        assert AuditLog.objects.filter(id=entry.id).exists()
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_bad_entry_does_not_lose_its_batch(self, mocker):
+        mocker.patch.object(writer, "close_old_connections")
+        good = [AuditLog(action=AuditAction.EXPORT, description=str(i)) for i in range(2)]
+        # Not JSON-serializable: fails the INSERT, not bound_changes
+        bad = AuditLog(action=AuditAction.EXPORT, changes={"value": {1, 2}})
+        
+        writer._persist([good[0], bad, good[1]])
+        
+        assert set(AuditLog.objects.values_list("id", flat=True)) == {entry.id for entry in good}
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_shutdown_drains_the_writer(self, settings):
+        settings.AUDIT_ASYNC_WRITES = True
+        entries = [log_audit_event(action=AuditAction.EXPORT, description=str(i)) for i in range(3)]
+        
+        writer._shutdown()
+        
+        assert not writer._writer_thread.is_alive()
+        assert AuditLog.objects.filter(id__in=[entry.id for entry in entries]).count() == 3
+
+
+@pytest.mark.django_db
+class TestAuditLogPartitions:
+    """Test monthly partitions can be created over rows in DEFAULT."""
+    
+    def test_partition_absorbs_default_rows(self):
+        import uuid
+        from django.db import connection
+        
+        entry_id = uuid.uuid4()
+        with connection.cursor() as cursor:
+            # No partition covers this month, so the row lands in DEFAULT
+            cursor.execute(
+                "INSERT INTO audit_logs (id, action, description, object_id, changes, "
+                "user_agent, request_path, request_method, \"timestamp\") "
+                "VALUES (%s, 'create', '', '', '{}', '', '', '', '2199-01-15')",
+                [entry_id],
+            )
+            cursor.execute("SELECT audit_logs_ensure_partition('2199-01-01')")
+            moved = cursor.fetchone()[0]
+            cursor.execute("SELECT tableoid::regclass::text FROM audit_logs WHERE id = %s", [entry_id])
+            partition = cursor.fetchone()[0]
+        
+        assert moved == 1
+        assert partition == "audit_logs_2199_01"
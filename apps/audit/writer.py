@@ -0,0 +1,157 @@
+"""
+Write-behind buffer for audit log entries.
+Keeps AuditLog INSERTs off the request path by batching them with bulk_create.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BATCH_SIZE = 1000
+AUDIT_FLUSH_INTERVAL = 0.5  # seconds to wait for a batch to fill up
+AUDIT_QUEUE_MAXSIZE = 10000
+AUDIT_SHUTDOWN_TIMEOUT = 10  # seconds to let the writer drain at exit
+
+# Queued at exit to stop the writer once everything ahead of it is written
+_STOP = object()
+
+_queue = queue.Queue(maxsize=AUDIT_QUEUE_MAXSIZE)
+_writer_lock = threading.Lock()
+_writer_thread = None
+
+
+def _write_batch(batch: list):
+    """Insert a batch of unsaved AuditLog instances."""
+    from .models import AuditLog
+    
+    for entry in batch:
+        entry.bound_changes()
+    AuditLog.objects.bulk_create(batch, batch_size=AUDIT_BATCH_SIZE)
+
+
+def _persist(batch: list):
+    """
+    Write a batch from the background thread, never letting it die on errors.
+    One bad entry fails the whole bulk INSERT, so on error the entries are
+    retried one by one and only those that still fail are lost (and logged).
+    """
+    close_old_connections()
+    try:
+        _write_batch(batch)
+        return
+    except Exception:
+        if len(batch) == 1:
+            logger.exception("Failed to write audit log entry %s", batch[0].id)
+            return
+        logger.warning(
+            "Failed to write %d audit log entries, retrying singly", len(batch), exc_info=True
+        )
+    
+    for entry in batch:
+        try:
+            _write_batch([entry])
+        except Exception:
+            logger.exception("Failed to write audit log entry %s", entry.id)
+
+
+def _run_writer():
+    """
+    Block for the first entry, then collect a batch for up to AUDIT_FLUSH_INTERVAL.
+    Returns after writing the batch in hand when _STOP comes off the queue.
+    """
+    try:
+        while True:
+            entry = _queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+            while len(batch) < AUDIT_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = _queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    _persist(batch)
+                    return
+                batch.append(entry)
+            _persist(batch)
+    finally:
+        connection.close()
+
+
+def _ensure_writer():
+    """
+    Start the writer thread on first use.
+    Started lazily (not in AppConfig.ready) so pre-fork servers get a live
+    thread in every worker process.
+    """
+    global _writer_thread
+    if _writer_thread is not None and _writer_thread.is_alive():
+        return
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(
+                target=_run_writer, name="audit-writer", daemon=True
+            )
+            _writer_thread.start()
+
+
+def enqueue(entry):
+    """
+    Queue an unsaved AuditLog instance for batched insertion.
+    Falls back to a synchronous write when async writes are disabled
+    or the queue is full, so entries are never dropped.
+    """
+    if not getattr(settings, "AUDIT_ASYNC_WRITES", True):
+        _write_batch([entry])
+        return
+    
+    _ensure_writer()
+    try:
+        _queue.put_nowait(entry)
+    except queue.Full:
+        _write_batch([entry])
+
+
+def flush():
+    """Write all currently queued entries immediately."""
+    batch = []
+    while True:
+        try:
+            entry = _queue.get_nowait()
+        except queue.Empty:
+            break
+        if entry is not _STOP:
+            batch.append(entry)
+    for start in range(0, len(batch), AUDIT_BATCH_SIZE):
+        _persist(batch[start:start + AUDIT_BATCH_SIZE])
+
+
+def _shutdown():
+    """
+    At exit, let the writer finish its in-flight batch and everything queued
+    ahead of _STOP, then write whatever is left. flush() alone only drains the
+    queue; the daemon thread would be killed mid-batch.
+    """
+    thread = _writer_thread
+    if thread is not None and thread.is_alive():
+        try:
+            _queue.put(_STOP, timeout=AUDIT_SHUTDOWN_TIMEOUT)
+        except queue.Full:
+            pass
+        else:
+            thread.join(AUDIT_SHUTDOWN_TIMEOUT)
+    flush()
+
+
+atexit.register(_shutdown)
@@ -1,4 +1,24 @@
 """Logic Engine app package."""
-from .engine import LogicEngine, LogicOperator, LogicAction, evaluate_cross_section_dependency
+from .engine import (
+    LogicAction,
+    LogicEngine,
+    LogicOperator,
+    OptionIndex,
+    build_option_index,
+    count_conditions,
+    evaluate_cross_section_dependency,
+    filter_indexed_options,
+    rules_key,
+)
 
-__all__ = ["LogicEngine", "LogicOperator", "LogicAction", "evaluate_cross_section_dependency"]
+__all__ = [
+    "LogicEngine",
+    "LogicOperator",
+    "LogicAction",
+    "OptionIndex",
+    "build_option_index",
+    "count_conditions",
+    "evaluate_cross_section_dependency",
+    "filter_indexed_options",
+    "rules_key",
+]
@@ -3,8 +3,20 @@ Conditional Logic Engine for ADSP.
 Maps to FR 1.2: Conditional Logic Engine.
 Supports: equals, not_equals, greater_than, less_than, contains, not_contains.
 """
+import json
+import re
+from collections import defaultdict
 from enum import Enum
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable, NamedTuple
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+
+# Cheap pre-check before validate_email: a non-empty local part and a
+# non-empty domain without "@". validate_email rejects anything this does;
+# forms it accepts, such as "a@b"@example.com or user@[::1], pass through
+_EMAIL_RE = re.compile(r"^.+@[^@]+\Z", re.DOTALL)
 
 
 class LogicOperator(str, Enum):
@@ -29,6 +41,154 @@ class LogicAction(str, Enum):
     HIDE = "hide"
 
 
+def _lower(value: Any) -> str:
+    return str(value).lower()
+
+
+def _split(value: Any):
+    # Lists are matched as-is; anything else is a comma-separated string
+    return value if isinstance(value, list) else tuple(str(value).split(","))
+
+
+def _in(actual: Any, expected: Any) -> bool:
+    if isinstance(expected, list):
+        return actual in expected
+    return str(actual) in expected
+
+
+def _never(actual: Any) -> bool:
+    return False
+
+
+def _is_empty(actual: Any) -> bool:
+    return actual is None or actual == "" or actual == []
+
+
+def _is_not_empty(actual: Any) -> bool:
+    return actual is not None and actual != "" and actual != []
+
+
+# Operator dispatch table, keyed by operator value and built once at import.
+# Each callable receives the expected value already passed through its
+# _EXPECTED_NORMALIZERS entry, so that work happens once per condition.
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    LogicOperator.EQUALS.value: lambda a, e: _lower(a) == e,
+    LogicOperator.NOT_EQUALS.value: lambda a, e: _lower(a) != e,
+    LogicOperator.GREATER_THAN.value: lambda a, e: a > e,
+    LogicOperator.LESS_THAN.value: lambda a, e: a < e,
+    LogicOperator.GREATER_THAN_OR_EQUALS.value: lambda a, e: a >= e,
+    LogicOperator.LESS_THAN_OR_EQUALS.value: lambda a, e: a <= e,
+    LogicOperator.CONTAINS.value: lambda a, e: e in _lower(a),
+    LogicOperator.NOT_CONTAINS.value: lambda a, e: e not in _lower(a),
+    LogicOperator.IN.value: _in,
+    LogicOperator.NOT_IN.value: lambda a, e: not _in(a, e),
+}
+
+_NUMERIC_OPERATORS = frozenset({
+    LogicOperator.GREATER_THAN.value,
+    LogicOperator.LESS_THAN.value,
+    LogicOperator.GREATER_THAN_OR_EQUALS.value,
+    LogicOperator.LESS_THAN_OR_EQUALS.value,
+})
+
+_EXPECTED_NORMALIZERS: dict[str, Callable[[Any], Any]] = {
+    LogicOperator.EQUALS.value: _lower,
+    LogicOperator.NOT_EQUALS.value: _lower,
+    LogicOperator.CONTAINS.value: _lower,
+    LogicOperator.NOT_CONTAINS.value: _lower,
+    LogicOperator.IN.value: _split,
+    LogicOperator.NOT_IN.value: _split,
+    **{operator: float for operator in _NUMERIC_OPERATORS},
+}
+
+
+def _compile_condition(operator: str, expected: Any) -> Callable[[Any], bool]:
+    """
+    Bind an operator and its normalized expected value into a check on the actual value.
+    """
+    if isinstance(operator, LogicOperator):
+        operator = operator.value
+    elif not isinstance(operator, str):
+        return _never
+    
+    # Handle null cases
+    if operator == LogicOperator.IS_EMPTY:
+        return _is_empty
+    
+    if operator == LogicOperator.IS_NOT_EMPTY:
+        return _is_not_empty
+    
+    op = _OPERATORS.get(operator)
+    if op is None:
+        return _never
+    
+    try:
+        expected = _EXPECTED_NORMALIZERS[operator](expected)
+    except (ValueError, TypeError):
+        return _never
+    
+    numeric = operator in _NUMERIC_OPERATORS
+    
+    def check(actual: Any) -> bool:
+        # For other operators, if actual is None, condition fails
+        if actual is None:
+            return False
+        if numeric:
+            try:
+                actual = float(actual)
+            except (ValueError, TypeError):
+                return False
+        return op(actual, expected)
+    
+    return check
+
+
+def _apply_operator(operator: str, actual: Any, expected: Any) -> bool:
+    """Apply the specified operator to compare values."""
+    return _compile_condition(operator, expected)(actual)
+
+
+def rules_key(rules: dict) -> str | None:
+    """
+    Hashable cache key for a rule set, or None if it has no conditions
+    (always visible). Cached survey structures store it per section and
+    field so validation does not serialise the rules on every call.
+    """
+    if not _has_conditions(rules):
+        return None
+    return json.dumps(rules, sort_keys=True, default=str)
+
+
+@lru_cache(maxsize=4096)
+def _compile_rules(rules_json: str) -> Callable[[Callable[[str], Any]], bool]:
+    """
+    Compile a rule set into a predicate over a response-data getter.
+    
+    Rules are parsed, expected values normalized and logic/action resolved once
+    per distinct rule set; the returned predicate only looks up values and
+    applies the bound checks.
+    """
+    rules = json.loads(rules_json)
+    conditions = tuple(
+        (c.get("field_id"), _compile_condition(c.get("operator"), c.get("value")))
+        for c in rules.get("conditions") or ()
+    )
+    if not conditions:
+        # No rules = always visible
+        return lambda get: True
+    
+    # Unknown logic defaults to AND
+    combine = any if rules.get("logic", "and").lower() == "or" else all
+    negate = rules.get("action", LogicAction.SHOW) == LogicAction.HIDE
+    
+    def predicate(get: Callable[[str], Any]) -> bool:
+        # Generator lets all()/any() stop at the first decisive condition
+        conditions_met = combine(check(get(field_id)) for field_id, check in conditions)
+        return conditions_met is not negate
+    
+    return predicate
+
+
 class LogicEngine:
     """
     Evaluates conditional visibility rules for survey sections and fields.
@@ -44,6 +204,8 @@ class LogicEngine:
     }
     """
     
+    __slots__ = ("response_data", "_get")
+    
     def __init__(self, response_data: dict):
         """
         Initialize with current response data.
@@ -52,6 +214,7 @@ class LogicEngine:
             response_data: Dict mapping field_id -> submitted value
         """
         self.response_data = response_data
+        self._get = response_data.get
     
     def evaluate_condition(self, condition: dict) -> bool:
         """
@@ -68,73 +231,13 @@ class LogicEngine:
         expected_value = condition.get("value")
         
         # Get actual value from response data
-        actual_value = self.response_data.get(field_id)
+        actual_value = self._get(field_id)
         
         return self._apply_operator(operator, actual_value, expected_value)
     
     def _apply_operator(self, operator: str, actual: Any, expected: Any) -> bool:
         """Apply the specified operator to compare values."""
-        
-        # Handle null cases
-        if operator == LogicOperator.IS_EMPTY:
-            return actual is None or actual == "" or actual == []
-        
-        if operator == LogicOperator.IS_NOT_EMPTY:
-            return actual is not None and actual != "" and actual != []
-        
-        # For other operators, if actual is None, condition fails
-        if actual is None:
-            return False
-        
-        # Type normalization for comparisons
-        if operator in (
-            LogicOperator.GREATER_THAN,
-            LogicOperator.LESS_THAN,
-            LogicOperator.GREATER_THAN_OR_EQUALS,
-            LogicOperator.LESS_THAN_OR_EQUALS,
-        ):
-            try:
-                actual = float(actual)
-                expected = float(expected)
-            except (ValueError, TypeError):
-                return False
-        
-        # Apply operators
-        if operator == LogicOperator.EQUALS:
-            return str(actual).lower() == str(expected).lower()
-        
-        elif operator == LogicOperator.NOT_EQUALS:
-            return str(actual).lower() != str(expected).lower()
-        
-        elif operator == LogicOperator.GREATER_THAN:
-            return actual > expected
-        
-        elif operator == LogicOperator.LESS_THAN:
-            return actual < expected
-        
-        elif operator == LogicOperator.GREATER_THAN_OR_EQUALS:
-            return actual >= expected
-        
-        elif operator == LogicOperator.LESS_THAN_OR_EQUALS:
-            return actual <= expected
-        
-        elif operator == LogicOperator.CONTAINS:
-            return str(expected).lower() in str(actual).lower()
-        
-        elif operator == LogicOperator.NOT_CONTAINS:
-            return str(expected).lower() not in str(actual).lower()
-        
-        elif operator == LogicOperator.IN:
-            if isinstance(expected, list):
-                return actual in expected
-            return str(actual) in str(expected).split(",")
-        
-        elif operator == LogicOperator.NOT_IN:
-            if isinstance(expected, list):
-                return actual not in expected
-            return str(actual) not in str(expected).split(",")
-        
-        return False
+        return _apply_operator(operator, actual, expected)
     
     def evaluate_rules(self, rules: dict) -> bool:
         """
@@ -146,35 +249,21 @@ class LogicEngine:
         Returns:
             bool: Whether the element should be visible
         """
-        if not rules or not rules.get("conditions"):
+        key = rules_key(rules)
+        if key is None:
             # No rules = always visible
             return True
         
-        conditions = rules.get("conditions", [])
-        logic = rules.get("logic", "and").lower()
-        action = rules.get("action", LogicAction.SHOW)
-        
-        if not conditions:
-            return True
-        
-        # Evaluate all conditions
-        results = [self.evaluate_condition(c) for c in conditions]
-        
-        # Apply logic
-        if logic == "and":
-            conditions_met = all(results)
-        elif logic == "or":
-            conditions_met = any(results)
-        else:
-            conditions_met = all(results)  # Default to AND
-        
-        # Apply action
-        if action == LogicAction.SHOW:
-            return conditions_met
-        elif action == LogicAction.HIDE:
-            return not conditions_met
-        
-        return conditions_met
+        predicate = _compile_rules(key)
+        return predicate(self._get)
+    
+    def _is_visible(self, element) -> bool:
+        """
+        Evaluate a section's or field's rules. Cached SectionSpec/FieldSpec
+        tuples carry their rules_key; model instances are keyed here.
+        """
+        key = element.rules_key if isinstance(element, tuple) else rules_key(element.logic_rules)
+        return key is None or _compile_rules(key)(self._get)
     
     def get_visible_sections(self, sections: list) -> list:
         """
@@ -215,58 +304,234 @@ class LogicEngine:
         Maps to FR 2.1: Real-time Validation.
         
         Args:
-            survey: Survey model instance with prefetched sections/fields
+            survey: Survey model instance (ideally with prefetched sections/fields)
+                    or a cached survey structure
             submitted_data: Dict of field_id -> value
             
         Returns:
             tuple: (is_valid, list of error messages)
         """
-        from django.core.validators import validate_email
-        from django.core.exceptions import ValidationError as DjangoValidationError
-        from apps.surveys.models import FieldType
-        
         errors = []
+        get_value = submitted_data.get
         
-        for section in survey.sections.all():
-            section_visible = self.evaluate_rules(section.logic_rules)
+        for section in _prefetched_sections(survey):
+            fields = _section_fields(section)
+            
+            # Hidden section hides all its fields; only check for stray data
+            if not self._is_visible(section):
+                for field in fields:
+                    if get_value(str(field.id)):
+                        errors.append(
+                            f"Field '{field.label}' should not have data (hidden by logic)"
+                        )
+                continue
             
-            for field in section.fields.all():
-                field_id = str(field.id)
-                field_visible = section_visible and self.evaluate_rules(field.logic_rules)
-                field_value = submitted_data.get(field_id)
+            for field in fields:
+                label = field.label
+                field_value = get_value(str(field.id))
                 
                 # Check for data in hidden fields
-                if not field_visible and field_value:
-                    errors.append(
-                        f"Field '{field.label}' should not have data (hidden by logic)"
-                    )
+                if not self._is_visible(field):
+                    if field_value:
+                        errors.append(f"Field '{label}' should not have data (hidden by logic)")
+                    continue
                 
-                # Check required fields that are visible
-                if field_visible and field.is_required:
-                    if not field_value or (isinstance(field_value, str) and not field_value.strip()):
-                        errors.append(f"Field '{field.label}' is required")
-                
-                # Validate email fields
-                if field_visible and field.field_type == FieldType.EMAIL and field_value:
-                    try:
-                        validate_email(field_value)
-                    except DjangoValidationError:
-                        errors.append(f"Field '{field.label}' must be a valid email address")
-                
-                # Validate number fields
-                if field_visible and field.field_type == FieldType.NUMBER and field_value is not None:
-                    try:
-                        num_value = float(field_value)
-                        if field.min_value is not None and num_value < field.min_value:
-                            errors.append(f"Field '{field.label}' must be at least {field.min_value}")
-                        if field.max_value is not None and num_value > field.max_value:
-                            errors.append(f"Field '{field.label}' must be at most {field.max_value}")
-                    except (ValueError, TypeError):
-                        errors.append(f"Field '{field.label}' must be a valid number")
+                _check_field_value(field, field_value, errors)
+        
+        return len(errors) == 0, errors
+    
+    def validate_unconditional_fields(self, survey, submitted_data: dict) -> tuple[bool, list[str]]:
+        """
+        Validate only fields that are always visible (no section or field rules).
+        The cheap synchronous half of validate_submission: required, email and
+        number checks run here; anything behind conditional logic is left to
+        the full validation.
+        
+        Returns:
+            tuple: (is_valid, list of error messages)
+        """
+        errors = []
+        get_value = submitted_data.get
+        
+        for section in _prefetched_sections(survey):
+            if _has_conditions(section.logic_rules):
+                continue
+            for field in _section_fields(section):
+                if not _has_conditions(field.logic_rules):
+                    _check_field_value(field, get_value(str(field.id)), errors)
         
         return len(errors) == 0, errors
 
 
+def _section_fields(section):
+    """Fields of a Section instance, or of a cached SectionSpec (a plain tuple)."""
+    fields = section.fields
+    return fields if isinstance(fields, tuple) else fields.all()
+
+
+def _has_conditions(rules: dict) -> bool:
+    """Whether a rule set can ever hide its element."""
+    return bool(rules) and bool(rules.get("conditions"))
+
+
+def _condition_count(rules: dict) -> int:
+    return len(rules["conditions"]) if _has_conditions(rules) else 0
+
+
+def count_conditions(survey) -> int:
+    """
+    Number of visibility conditions across a survey's sections and fields,
+    a measure of what full validation costs.
+    """
+    total = 0
+    for section in _prefetched_sections(survey):
+        total += _condition_count(section.logic_rules)
+        total += sum(_condition_count(field.logic_rules) for field in _section_fields(section))
+    return total
+
+
+def _check_field_value(field, field_value: Any, errors: list[str]) -> None:
+    """Append required/email/number errors for a visible field."""
+    FieldType = _field_type()
+    label = field.label
+    
+    # Check required fields that are visible
+    if field.is_required:
+        if not field_value or (isinstance(field_value, str) and not field_value.strip()):
+            errors.append(f"Field '{label}' is required")
+    
+    field_type = field.field_type
+    
+    # Validate email fields
+    if field_type == FieldType.EMAIL and field_value:
+        if not isinstance(field_value, str) or not _EMAIL_RE.match(field_value):
+            errors.append(f"Field '{label}' must be a valid email address")
+        else:
+            try:
+                validate_email(field_value)
+            except DjangoValidationError:
+                errors.append(f"Field '{label}' must be a valid email address")
+    
+    # Validate number fields
+    elif field_type == FieldType.NUMBER and field_value is not None:
+        try:
+            num_value = float(field_value)
+            if field.min_value is not None and num_value < field.min_value:
+                errors.append(f"Field '{label}' must be at least {field.min_value}")
+            if field.max_value is not None and num_value > field.max_value:
+                errors.append(f"Field '{label}' must be at most {field.max_value}")
+        except (ValueError, TypeError):
+            errors.append(f"Field '{label}' must be a valid number")
+
+
+_FIELD_TYPE = None
+
+
+def _field_type():
+    """
+    Return the FieldType enum, importing it on first use.
+    apps.surveys.models cannot be imported at module scope because this
+    package is loaded while the app registry is still being populated.
+    """
+    global _FIELD_TYPE
+    if _FIELD_TYPE is None:
+        from apps.surveys.models import FieldType
+        
+        _FIELD_TYPE = FieldType
+    return _FIELD_TYPE
+
+
+def _prefetched_sections(survey):
+    """
+    Return a survey's sections with their fields loaded in a fixed number of queries.
+    
+    Accepts a cached structure (apps.surveys.cache.get_survey_structure) as-is.
+    Reuses the caller's prefetch (e.g. ``prefetch_related("sections__fields")``)
+    when present, otherwise prefetches fields here to avoid one query per section.
+    """
+    if isinstance(survey, tuple):
+        return survey
+    if "sections" in getattr(survey, "_prefetched_objects_cache", {}):
+        return survey.sections.all()
+    return survey.sections.prefetch_related("fields").order_by("order")
+
+
+class OptionIndex(NamedTuple):
+    """A dependent field's options, pre-filtered per source value."""
+    
+    options: list
+    filter_key: str
+    # Options without filters, shown for any source value
+    unfiltered: list
+    # Source value -> matching and unfiltered options, in original order
+    by_value: dict
+    # Some filter value could not be hashed; lookups scan options instead
+    has_unhashable: bool
+
+
+def build_option_index(target_options: list[dict], filter_key: str) -> OptionIndex:
+    """
+    Index options by their filter value for repeated dependency lookups.
+    Build once per field (build_survey_structure does this for dependent
+    fields) and query per respondent with filter_indexed_options().
+    
+    Args:
+        target_options: List of option dicts with filters (see
+                        evaluate_cross_section_dependency)
+        filter_key: The filter key to index on (e.g., "country")
+        
+    Returns:
+        OptionIndex: the options resolved for every filter value
+    """
+    unfiltered_positions = []
+    positions = defaultdict(list)
+    has_unhashable = False
+    for position, option in enumerate(target_options):
+        filters = option.get("filters", {})
+        if not filters:
+            # No filter = always include
+            unfiltered_positions.append(position)
+            continue
+        
+        value = filters.get(filter_key)
+        if value is None:
+            continue
+        try:
+            positions[value].append(position)
+        except TypeError:
+            has_unhashable = True
+    
+    return OptionIndex(
+        options=target_options,
+        filter_key=filter_key,
+        unfiltered=[target_options[position] for position in unfiltered_positions],
+        by_value={
+            value: [target_options[position] for position in sorted(matched + unfiltered_positions)]
+            for value, matched in positions.items()
+        },
+        has_unhashable=has_unhashable,
+    )
+
+
+def filter_indexed_options(option_index: OptionIndex, source_field_value: Any) -> list[dict]:
+    """
+    Filter options from a build_option_index() result.
+    Matching and unfiltered options are returned in their original order.
+    """
+    if not source_field_value:
+        return option_index.options
+    
+    if not option_index.has_unhashable:
+        try:
+            return option_index.by_value.get(source_field_value, option_index.unfiltered)
+        except TypeError:
+            pass
+    # Unhashable values on either side compare by equality
+    return evaluate_cross_section_dependency(
+        source_field_value, option_index.options, option_index.filter_key
+    )
+
+
 def evaluate_cross_section_dependency(
     source_field_value: Any,
     target_options: list[dict],
@@ -277,6 +542,8 @@ def evaluate_cross_section_dependency(
     Maps to FR 1.3: Cross-Section Dependencies.
     
     Example: Country = "USA" filters State options to US states.
+    For repeated lookups against the same options, build the index once
+    with build_option_index() and use filter_indexed_options().
     
     Args:
         source_field_value: Value from the source field (e.g., "USA")
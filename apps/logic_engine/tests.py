@@ -4,7 +4,15 @@ Maps to QA Plan: Unit Testing - Focus on the "Logic Engine".
 """
 import pytest
 
-from apps.logic_engine import LogicEngine, LogicOperator, evaluate_cross_section_dependency
+from apps.logic_engine import (
+    LogicEngine,
+    LogicOperator,
+    build_option_index,
+    count_conditions,
+    evaluate_cross_section_dependency,
+    filter_indexed_options,
+)
+from apps.logic_engine import engine as engine_module
 
 
 class TestLogicOperators:
@@ -89,6 +97,21 @@ class TestLogicOperators:
         engine = LogicEngine({"country": "Germany"})
         condition = {"field_id": "country", "operator": "in", "value": ["USA", "Canada", "UK"]}
         assert engine.evaluate_condition(condition) is False
+    
+    def test_not_in_operator_string(self):
+        engine = LogicEngine({"country": "Germany"})
+        condition = {"field_id": "country", "operator": "not_in", "value": "USA,Canada,UK"}
+        assert engine.evaluate_condition(condition) is True
+    
+    def test_enum_operator(self):
+        engine = LogicEngine({"age": 25})
+        condition = {"field_id": "age", "operator": LogicOperator.GREATER_THAN, "value": 18}
+        assert engine.evaluate_condition(condition) is True
+    
+    def test_unknown_operator(self):
+        engine = LogicEngine({"field1": "USA"})
+        condition = {"field_id": "field1", "operator": "matches", "value": "USA"}
+        assert engine.evaluate_condition(condition) is False
 
 
 class TestLogicRules:
@@ -169,10 +192,47 @@ class TestLogicRules:
         }
         assert engine.evaluate_rules(rules) is False
     
+    def test_and_logic_stops_at_first_false(self):
+        class RecordingData(dict):
+            def __init__(self, *args):
+                super().__init__(*args)
+                self.requested = []
+            
+            def get(self, key, default=None):
+                self.requested.append(key)
+                return super().get(key, default)
+        
+        data = RecordingData({"country": "Canada", "age": 25})
+        rules = {
+            "conditions": [
+                {"field_id": "country", "operator": "equals", "value": "USA"},
+                {"field_id": "age", "operator": "greater_than", "value": 18}
+            ],
+            "logic": "and",
+            "action": "show"
+        }
+        
+        assert LogicEngine(data).evaluate_rules(rules) is False
+        assert data.requested == ["country"]
+    
     def test_empty_rules_always_visible(self):
         engine = LogicEngine({})
         assert engine.evaluate_rules({}) is True
         assert engine.evaluate_rules(None) is True
+    
+    def test_compiled_rules_reused_across_engines(self):
+        from apps.logic_engine.engine import _compile_rules
+        
+        rules = {
+            "conditions": [{"field_id": "country", "operator": "equals", "value": "USA"}],
+            "logic": "and",
+            "action": "show"
+        }
+        _compile_rules.cache_clear()
+        
+        assert LogicEngine({"country": "USA"}).evaluate_rules(rules) is True
+        assert LogicEngine({"country": "Canada"}).evaluate_rules(rules) is False
+        assert _compile_rules.cache_info().misses == 1
 
 
 class TestCrossSectionDependency:
@@ -210,3 +270,171 @@ class TestCrossSectionDependency:
         result = evaluate_cross_section_dependency(None, options, "country")
         
         assert len(result) == 1
+    
+    def test_indexed_lookup_preserves_order(self):
+        options = [
+            {"value": "CA", "label": "California", "filters": {"country": "USA"}},
+            {"value": "other", "label": "Other"},
+            {"value": "ON", "label": "Ontario", "filters": {"country": "Canada"}},
+            {"value": "TX", "label": "Texas", "filters": {"country": "USA"}},
+        ]
+        index = build_option_index(options, "country")
+        
+        usa = filter_indexed_options(index, "USA")
+        canada = filter_indexed_options(index, "Canada")
+        
+        assert [o["value"] for o in usa] == ["CA", "other", "TX"]
+        assert [o["value"] for o in canada] == ["other", "ON"]
+        assert filter_indexed_options(index, "") == options
+    
+    def test_indexed_lookup_compares_unhashable_values(self):
+        options = [
+            {"value": "CA", "label": "California", "filters": {"country": ["USA"]}},
+            {"value": "ON", "label": "Ontario", "filters": {"country": "Canada"}},
+        ]
+        index = build_option_index(options, "country")
+        
+        assert filter_indexed_options(index, ["USA"]) == [options[0]]
+        assert filter_indexed_options(index, "Canada") == [options[1]]
+    
+    def test_survey_structure_indexes_dependent_options(self, complete_survey):
+        from apps.surveys.cache import build_survey_structure
+        from apps.surveys.models import Field, FieldType
+        
+        section = complete_survey.sections.get(order=0)
+        options = [
+            {"value": "CA", "label": "California", "filters": {"country": "USA"}},
+            {"value": "ON", "label": "Ontario", "filters": {"country": "Canada"}},
+        ]
+        Field.objects.create(
+            section=section, field_type=FieldType.SELECT, label="State", order=99,
+            options=options, dependency_config={"depends_on": "country", "filter_by": "country"},
+        )
+        
+        fields = build_survey_structure(complete_survey.id)[0].fields
+        
+        assert fields[-1].option_index is not None
+        assert filter_indexed_options(fields[-1].option_index, "USA") == [options[0]]
+        assert all(field.option_index is None for field in fields[:-1])
+
+
+class TestValidateSubmissionQueries:
+    """Test validate_submission loads the section/field tree without N+1 queries."""
+    
+    def test_unprefetched_survey_uses_two_queries(self, complete_survey, django_assert_num_queries):
+        engine = LogicEngine({})
+        
+        with django_assert_num_queries(2):
+            engine.validate_submission(complete_survey, {})
+    
+    def test_prefetched_survey_uses_no_queries(self, complete_survey, django_assert_num_queries):
+        from apps.surveys.models import Survey
+        
+        survey = Survey.objects.prefetch_related("sections__fields").get(id=complete_survey.id)
+        engine = LogicEngine({})
+        
+        with django_assert_num_queries(0):
+            engine.validate_submission(survey, {})
+    
+    def test_survey_structure_uses_one_query(self, complete_survey, django_assert_num_queries):
+        from apps.surveys.cache import build_survey_structure
+        
+        with django_assert_num_queries(1):
+            structure = build_survey_structure(complete_survey.id)
+            is_valid, errors = LogicEngine({}).validate_submission(structure, {})
+        
+        assert is_valid is False
+        assert "Field 'Full Name' is required" in errors
+
+
+class TestValidateSubmission:
+    """Test submission validation rules."""
+    
+    @pytest.mark.parametrize("value", ["not-an-email", "user@", 42])
+    def test_invalid_email_rejected(self, complete_survey, value):
+        email_field = complete_survey.sections.get(order=0).fields.get(order=1)
+        engine = LogicEngine({str(email_field.id): value})
+        
+        is_valid, errors = engine.validate_submission(complete_survey, engine.response_data)
+        
+        assert is_valid is False
+        assert "Field 'Email Address' must be a valid email address" in errors
+    
+    @pytest.mark.parametrize("value", ['"a@b"@example.com', "user@[::1]", "user@localhost"])
+    def test_valid_unusual_email_accepted(self, complete_survey, value):
+        email_field = complete_survey.sections.get(order=0).fields.get(order=1)
+        engine = LogicEngine({str(email_field.id): value})
+        
+        _, errors = engine.validate_submission(complete_survey, engine.response_data)
+        
+        assert "Field 'Email Address' must be a valid email address" not in errors
+    
+    @pytest.mark.parametrize("value", [
+        "not-an-email", "user@", "@example.com", "a@b@", '"a@b"@example.com', "user@[::1]",
+        '"a b"@example.com', "user@[IPv6:::1]", "x@y", "user@localhost",
+    ])
+    def test_email_precheck_never_rejects_valid_addresses(self, value):
+        from django.core.exceptions import ValidationError
+        from django.core.validators import validate_email
+        
+        try:
+            validate_email(value)
+        except ValidationError:
+            accepted = False
+        else:
+            accepted = True
+        
+        assert not accepted or engine_module._EMAIL_RE.match(value)
+    
+    def test_hidden_section_rejects_data(self, survey_with_logic):
+        country_field = survey_with_logic.sections.get(order=0).fields.get()
+        state_field = survey_with_logic.sections.get(order=1).fields.get()
+        data = {str(country_field.id): "other", str(state_field.id): "ca"}
+        
+        is_valid, errors = LogicEngine(data).validate_submission(survey_with_logic, data)
+        
+        assert is_valid is False
+        assert errors == ["Field 'State' should not have data (hidden by logic)"]
+    
+    def test_survey_structure_matches_model_validation(self, survey_with_logic):
+        from apps.surveys.cache import build_survey_structure
+        
+        country_field = survey_with_logic.sections.get(order=0).fields.get()
+        state_field = survey_with_logic.sections.get(order=1).fields.get()
+        data = {str(country_field.id): "other", str(state_field.id): "ca"}
+        structure = build_survey_structure(survey_with_logic.id)
+        
+        assert LogicEngine(data).validate_submission(structure, data) == (
+            LogicEngine(data).validate_submission(survey_with_logic, data)
+        )
+    
+    def test_survey_structure_rules_are_keyed_once(self, survey_with_logic, mocker):
+        from apps.surveys.cache import build_survey_structure
+        
+        structure = build_survey_structure(survey_with_logic.id)
+        assert structure[0].rules_key is None
+        assert structure[1].rules_key is not None
+        
+        dumps = mocker.spy(engine_module.json, "dumps")
+        data = {structure[0].fields[0].id: "usa"}
+        LogicEngine(data).validate_submission(structure, data)
+        
+        assert dumps.call_count == 0
+    
+    def test_unconditional_validation_skips_conditional_fields(self, survey_with_logic):
+        country_field = survey_with_logic.sections.get(order=0).fields.get()
+        state_field = survey_with_logic.sections.get(order=1).fields.get()
+        data = {str(country_field.id): "other", str(state_field.id): "ca"}
+        
+        is_valid, errors = LogicEngine(data).validate_unconditional_fields(survey_with_logic, data)
+        
+        assert is_valid is True
+        assert errors == []
+        assert count_conditions(survey_with_logic) == 1
+    
+    def test_unconditional_validation_checks_required(self, complete_survey):
+        is_valid, errors = LogicEngine({}).validate_unconditional_fields(complete_survey, {})
+        
+        assert is_valid is False
+        assert "Field 'Full Name' is required" in errors
+        assert count_conditions(complete_survey) == 0
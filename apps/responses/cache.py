@@ -0,0 +1,48 @@
+"""
+Redis-based de-duplication of partial-save heartbeats.
+Maps to FR 2.2: Partial Saves (Heartbeat).
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+
+PARTIAL_SAVE_PREFIX = "partial_save"
+# Bounds how long an idle heartbeat can skip the write (and last_updated)
+PARTIAL_SAVE_TIMEOUT = 60 * 60  # 1 hour
+
+
+def get_partial_save_cache_key(survey_id, session_token) -> str:
+    """Generate cache key for the last partial saved in a session."""
+    return f"{PARTIAL_SAVE_PREFIX}:{survey_id}:{session_token}"
+
+
+def partial_save_digest(values: dict) -> bytes:
+    """8-byte digest of the values a heartbeat would write."""
+    encoded = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode(), digest_size=8).digest()
+
+
+def get_saved_partial(survey_id, session_token, digest: bytes):
+    """
+    Return the serialized partial last saved with these exact values.
+    Returns None if the values changed or nothing is cached.
+    """
+    cached = cache.get(get_partial_save_cache_key(survey_id, session_token))
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    return None
+
+
+def set_saved_partial(survey_id, session_token, digest: bytes, payload: dict):
+    """Remember the values and serialized partial of the latest save."""
+    cache.set(
+        get_partial_save_cache_key(survey_id, session_token),
+        (digest, payload),
+        PARTIAL_SAVE_TIMEOUT,
+    )
+
+
+def invalidate_saved_partial(survey_id, session_token):
+    """Forget a session's last save (call when its partial is deleted)."""
+    cache.delete(get_partial_save_cache_key(survey_id, session_token))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-16 01:20
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("responses", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="partialresponse",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["data"],
+                name="idx_partial_responses_data_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="response",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["data"], name="idx_responses_data_gin", opclasses=["jsonb_path_ops"]
+            ),
+        ),
+    ]
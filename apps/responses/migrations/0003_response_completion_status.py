@@ -0,0 +1,54 @@
+# Generated by Django 5.2.9 on 2026-10-16 01:50
+
+from django.db import migrations, models
+
+# Move keys already stored in data into the new columns
+BACKFILL_SQL = """
+UPDATE responses
+SET completion_status = data->>'completion_status'
+WHERE data->>'completion_status' IN ('complete', 'partial', 'screened_out');
+
+UPDATE responses
+SET completion_time_seconds = (data->>'completion_time_seconds')::integer
+WHERE completion_time_seconds IS NULL
+  AND data->>'completion_time_seconds' ~ '^[0-9]{1,9}$';
+
+UPDATE responses
+SET data = data - 'completion_status' - 'completion_time_seconds'
+WHERE data ?| array['completion_status', 'completion_time_seconds'];
+"""
+
+
+def backfill_completion_columns(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(BACKFILL_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("responses", "0002_response_data_gin_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="response",
+            name="completion_status",
+            field=models.CharField(
+                choices=[
+                    ("complete", "Complete"),
+                    ("partial", "Partial"),
+                    ("screened_out", "Screened Out"),
+                ],
+                db_index=True,
+                default="complete",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="response",
+            name="completion_time_seconds",
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_completion_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-16 02:10
+
+import uuid
+
+from django.db import migrations, models
+
+# Must match apps.responses.models.SESSION_TOKEN_NAMESPACE
+SESSION_TOKEN_NAMESPACE = uuid.UUID("4f0b8a52-7c3e-4d1a-9b6f-2e8d5c1a7f30")
+
+UUID_REGEX = r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$"
+
+
+def coerce_legacy_session_tokens(apps, schema_editor):
+    """Rewrite non-UUID tokens so the column cast to uuid cannot fail."""
+    PartialResponse = apps.get_model("responses", "PartialResponse")
+    legacy = PartialResponse.objects.exclude(session_token__regex=UUID_REGEX)
+    for partial_id, token in legacy.values_list("id", "session_token").iterator():
+        PartialResponse.objects.filter(id=partial_id).update(
+            session_token=str(uuid.uuid5(SESSION_TOKEN_NAMESPACE, token))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("responses", "0003_response_completion_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(coerce_legacy_session_tokens, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="partialresponse",
+            name="partial_res_session_93fb15_idx",
+        ),
+        migrations.AlterField(
+            model_name="partialresponse",
+            name="session_token",
+            field=models.UUIDField(db_index=True),
+        ),
+    ]
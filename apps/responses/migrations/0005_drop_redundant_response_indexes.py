@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-16 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("responses", "0004_partialresponse_session_token_uuid"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="partialresponse",
+            name="partial_res_survey__0ad956_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="response",
+            name="responses_survey__edb083_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="response",
+            name="responses_user_id_bf83a4_idx",
+        ),
+        migrations.AlterField(
+            model_name="partialresponse",
+            name="session_token",
+            field=models.UUIDField(),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-16 02:40
+
+from django.db import migrations, models
+
+
+def mark_existing_responses_valid(apps, schema_editor):
+    """Existing responses were fully validated synchronously on submit."""
+    Response = apps.get_model("responses", "Response")
+    Response.objects.update(validation_status="valid")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("responses", "0005_drop_redundant_response_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="response",
+            name="validation_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("valid", "Valid"),
+                    ("invalid", "Invalid"),
+                ],
+                db_index=True,
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(mark_existing_responses_valid, migrations.RunPython.noop),
+    ]
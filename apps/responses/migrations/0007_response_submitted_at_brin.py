@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-16 02:55
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    RemoveIndexConcurrently,
+)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("responses", "0006_response_validation_status"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="response",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["submitted_at"],
+                name="idx_responses_submitted_brin",
+                pages_per_range=32,
+            ),
+        ),
+        RemoveIndexConcurrently(
+            model_name="response",
+            name="responses_submitt_f56fdd_idx",
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-16 03:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("responses", "0007_response_submitted_at_brin"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="response",
+            index=models.Index(
+                fields=["survey", "-submitted_at"], name="resp_survey_submitted_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-16 03:25
+
+import ast
+import json
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def convert_repr_to_json(apps, schema_editor):
+    """Rewrite encrypted_data stored as a Python dict repr as JSON."""
+    Response = apps.get_model("responses", "Response")
+    
+    batch = []
+    for response in Response.objects.filter(encrypted_data__startswith="{").only(
+        "id", "encrypted_data"
+    ).iterator(chunk_size=BATCH_SIZE):
+        try:
+            json.loads(response.encrypted_data)
+            continue
+        except ValueError:
+            pass
+        response.encrypted_data = json.dumps(
+            ast.literal_eval(response.encrypted_data), separators=(",", ":")
+        )
+        batch.append(response)
+        if len(batch) == BATCH_SIZE:
+            Response.objects.bulk_update(batch, ["encrypted_data"])
+            batch = []
+    Response.objects.bulk_update(batch, ["encrypted_data"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("responses", "0008_response_survey_submitted_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_repr_to_json, migrations.RunPython.noop),
+    ]
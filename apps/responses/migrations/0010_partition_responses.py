@@ -0,0 +1,91 @@
+"""
+Convert responses into a table hash-partitioned on survey_id.
+
+Every hot query (list, export, per-survey analytics) filters by survey, so
+partition pruning confines it to one of RESPONSE_PARTITIONS partitions.
+PostgreSQL requires the partition key in every unique constraint, so the
+database primary key becomes (id, survey_id); Django keeps treating "id"
+as the primary key. Secondary indexes and foreign keys are read from the
+catalog before the swap and recreated, under their existing names, on the
+partitioned table (which cascades them to every partition).
+"""
+from django.db import migrations
+
+RESPONSE_PARTITIONS = 16
+
+PARTITION_SQL = """
+ALTER TABLE responses RENAME TO responses_legacy;
+
+CREATE TABLE responses (
+    LIKE responses_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY HASH (survey_id);
+ALTER TABLE responses ADD CONSTRAINT responses_pkey_partitioned PRIMARY KEY (id, survey_id);
+""" + "".join(
+    f"CREATE TABLE responses_p{remainder} PARTITION OF responses "
+    f"FOR VALUES WITH (MODULUS {RESPONSE_PARTITIONS}, REMAINDER {remainder});\n"
+    for remainder in range(RESPONSE_PARTITIONS)
+) + """
+INSERT INTO responses SELECT * FROM responses_legacy;
+DROP TABLE responses_legacy;
+"""
+
+UNPARTITION_SQL = """
+ALTER TABLE responses RENAME TO responses_partitioned;
+
+CREATE TABLE responses (
+    LIKE responses_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+);
+ALTER TABLE responses ADD CONSTRAINT responses_pkey PRIMARY KEY (id);
+
+INSERT INTO responses SELECT * FROM responses_partitioned;
+DROP TABLE responses_partitioned;
+"""
+
+SECONDARY_INDEXES_SQL = """
+SELECT pg_get_indexdef(indexrelid) FROM pg_index
+WHERE indrelid = 'responses'::regclass AND NOT indisprimary
+"""
+
+FOREIGN_KEYS_SQL = """
+SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+WHERE conrelid = 'responses'::regclass AND contype = 'f'
+"""
+
+
+def _swap_table(schema_editor, swap_sql):
+    """Run swap_sql, then restore the secondary indexes and foreign keys."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(SECONDARY_INDEXES_SQL)
+        # Partitioned parents report their indexes as ON ONLY
+        indexes = [row[0].replace(" ON ONLY ", " ON ") for row in cursor.fetchall()]
+        cursor.execute(FOREIGN_KEYS_SQL)
+        foreign_keys = cursor.fetchall()
+    
+    schema_editor.execute(swap_sql, params=None)
+    for index_sql in indexes:
+        schema_editor.execute(index_sql, params=None)
+    for name, definition in foreign_keys:
+        schema_editor.execute(
+            f"ALTER TABLE responses ADD CONSTRAINT {name} {definition}", params=None
+        )
+
+
+def partition_responses(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        _swap_table(schema_editor, PARTITION_SQL)
+
+
+def unpartition_responses(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        _swap_table(schema_editor, UNPARTITION_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("responses", "0009_response_encrypted_data_json"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_responses, unpartition_responses),
+    ]
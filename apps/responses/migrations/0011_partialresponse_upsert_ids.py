@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-16 04:10
+
+import uuid
+
+import django.db.models.functions.datetime
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def derive_partial_ids(apps, schema_editor):
+    """Give existing partials the session-derived id PartialResponse.upsert assigns."""
+    PartialResponse = apps.get_model("responses", "PartialResponse")
+    
+    rows = PartialResponse.objects.values_list("id", "survey_id", "session_token")
+    for partial_id, survey_id, session_token in rows.iterator():
+        derived_id = uuid.uuid5(session_token, str(survey_id))
+        if partial_id != derived_id:
+            PartialResponse.objects.filter(id=partial_id).update(id=derived_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("responses", "0010_partition_responses"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="partialresponse",
+            name="started_at",
+            field=models.DateTimeField(
+                db_default=django.db.models.functions.datetime.Now(),
+                default=django.utils.timezone.now,
+                editable=False,
+            ),
+        ),
+        migrations.RunPython(derive_partial_ids, migrations.RunPython.noop),
+    ]
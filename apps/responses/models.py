@@ -5,7 +5,33 @@ Maps to FR 2.1, FR 2.2: Real-time Validation and Partial Saves.
 import uuid
 
 from django.conf import settings
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
 from django.db import models
+from django.db.models.functions import Now
+from django.utils import timezone
+
+
+class CompletionStatus(models.TextChoices):
+    """How a submission ended."""
+    
+    COMPLETE = "complete", "Complete"
+    PARTIAL = "partial", "Partial"
+    SCREENED_OUT = "screened_out", "Screened Out"
+
+
+class ValidationStatus(models.TextChoices):
+    """Outcome of the deferred conditional-logic validation."""
+    
+    PENDING = "pending", "Pending"
+    VALID = "valid", "Valid"
+    INVALID = "invalid", "Invalid"
+
+
+class ResponseManager(models.Manager):
+    """Leaves encrypted_data out of every SELECT unless explicitly requested."""
+    
+    def get_queryset(self):
+        return super().get_queryset().defer("encrypted_data")
 
 
 class Response(models.Model):
@@ -30,10 +56,14 @@ class Response(models.Model):
     
     # Response data (JSONB)
     # Structure: {"field_uuid": "value", "field_uuid2": ["multi", "values"]}
+    # Indexed with GIN jsonb_path_ops: query it by containment
+    # (data__contains={"field_uuid": "value"}, i.e. data @> '{...}');
+    # key lookups like data__field_uuid="value" cannot use the index.
     data = models.JSONField(default=dict)
     
     # Encrypted storage for sensitive field values
     # TODO: Add encryption in production
+    # Deferred by ResponseManager; load it with .only("encrypted_data")
     encrypted_data = models.TextField(blank=True, default="")
     
     # Submission metadata
@@ -42,27 +72,79 @@ class Response(models.Model):
     user_agent = models.CharField(max_length=500, blank=True)
     
     # Completion tracking
-    completion_time_seconds = models.PositiveIntegerField(null=True, blank=True)
+    # Filtered on by admin/list views, so kept in real indexed columns;
+    # clients may still send them inside data (see DATA_COLUMN_KEYS)
+    completion_status = models.CharField(
+        max_length=20,
+        choices=CompletionStatus.choices,
+        default=CompletionStatus.COMPLETE,
+        db_index=True
+    )
+    completion_time_seconds = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    
+    # Set by validate_logic_async for surveys with conditional logic
+    validation_status = models.CharField(
+        max_length=20,
+        choices=ValidationStatus.choices,
+        default=ValidationStatus.PENDING,
+        db_index=True
+    )
+    
+    # Keys lifted out of submitted data into the columns above
+    DATA_COLUMN_KEYS = ("completion_status", "completion_time_seconds")
+    
+    objects = ResponseManager()
     
     class Meta:
+        # Hash-partitioned on survey_id with primary key (id, survey_id) on
+        # PostgreSQL (migration 0010); indexes cannot be added CONCURRENTLY
         db_table = "responses"
         ordering = ["-submitted_at"]
+        # survey/user alone are covered by their ForeignKey indexes
         indexes = [
-            models.Index(fields=["survey"]),
-            models.Index(fields=["user"]),
             models.Index(fields=["survey", "user"]),
-            models.Index(fields=["submitted_at"]),
+            # Serves the per-survey list, newest first, and its cursor pages
+            models.Index(fields=["survey", "-submitted_at"], name="resp_survey_submitted_idx"),
+            # Rows arrive in submitted_at order, so block ranges suffice
+            BrinIndex(
+                fields=["submitted_at"],
+                pages_per_range=32,
+                name="idx_responses_submitted_brin"
+            ),
+            GinIndex(
+                fields=["data"],
+                opclasses=["jsonb_path_ops"],
+                name="idx_responses_data_gin"
+            ),
         ]
     
     def __str__(self):
         return f"Response to {self.survey.title} by {self.user or 'Anonymous'}"
 
 
+# Legacy free-form tokens map onto UUIDs deterministically (see session_token_uuid)
+SESSION_TOKEN_NAMESPACE = uuid.UUID("4f0b8a52-7c3e-4d1a-9b6f-2e8d5c1a7f30")
+
+
+def session_token_uuid(token) -> uuid.UUID:
+    """
+    Coerce a client-supplied session token to the UUID stored in the DB.
+    Non-UUID tokens (issued before the column became a UUID) hash to the
+    same UUID the migration assigned to their rows.
+    """
+    if isinstance(token, uuid.UUID):
+        return token
+    try:
+        return uuid.UUID(str(token))
+    except ValueError:
+        return uuid.uuid5(SESSION_TOKEN_NAMESPACE, str(token))
+
+
 class PartialResponse(models.Model):
     """
     Stores in-progress survey submissions for auto-save/heartbeat.
     Maps to FR 2.2: Partial Saves (Heartbeat).
-    Indexed by session_token for anonymous users.
+    Identified by session_token for anonymous users.
     """
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -73,7 +155,7 @@ class PartialResponse(models.Model):
     )
     
     # Session token for anonymous identification
-    session_token = models.CharField(max_length=255, db_index=True)
+    session_token = models.UUIDField()
     
     # Optional user linkage
     user = models.ForeignKey(
@@ -92,16 +174,22 @@ class PartialResponse(models.Model):
     last_field_id = models.UUIDField(null=True, blank=True)
     
     # Timestamps
-    started_at = models.DateTimeField(auto_now_add=True)
+    # db_default makes the upsert's RETURNING report the stored value; see upsert()
+    started_at = models.DateTimeField(default=timezone.now, db_default=Now(), editable=False)
     last_updated = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = "partial_responses"
         ordering = ["-last_updated"]
+        # Lookups are always (survey, session_token), served by the
+        # unique_survey_session index; last_updated drives the cleanup task
         indexes = [
-            models.Index(fields=["survey", "session_token"]),
-            models.Index(fields=["session_token"]),
             models.Index(fields=["last_updated"]),
+            GinIndex(
+                fields=["data"],
+                opclasses=["jsonb_path_ops"],
+                name="idx_partial_responses_data_gin"
+            ),
         ]
         constraints = [
             models.UniqueConstraint(
@@ -111,4 +199,33 @@ class PartialResponse(models.Model):
         ]
     
     def __str__(self):
-        return f"Partial: {self.survey.title} - {self.session_token[:8]}..."
+        return f"Partial: {self.survey.title} - {str(self.session_token)[:8]}..."
+    
+    @classmethod
+    def upsert(cls, survey_id, session_token, **defaults):
+        """
+        Insert or update the partial for (survey_id, session_token) in a single
+        INSERT ... ON CONFLICT statement backed by unique_survey_session.
+        Returns (partial, created) like update_or_create.
+        
+        The id is derived from the session (see migration 0011), so the row
+        inserted here and one already stored agree on it. started_at comes
+        back from RETURNING and is still the value sent here only if this
+        statement inserted the row.
+        """
+        session_token = session_token_uuid(session_token)
+        now = timezone.now()
+        partial = cls(
+            id=uuid.uuid5(session_token, str(survey_id)),
+            survey_id=survey_id,
+            session_token=session_token,
+            started_at=now,
+            **defaults,
+        )
+        cls.objects.bulk_create(
+            [partial],
+            update_conflicts=True,
+            unique_fields=["survey", "session_token"],
+            update_fields=["last_updated", *defaults],
+        )
+        return partial, partial.started_at == now
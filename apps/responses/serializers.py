@@ -3,26 +3,54 @@ from rest_framework import serializers
 
 from apps.surveys.models import Survey
 
-from .models import PartialResponse, Response
+from .models import CompletionStatus, PartialResponse, Response
 
 
-class ResponseSerializer(serializers.ModelSerializer):
+class ResponseListSerializer(serializers.ModelSerializer):
+    """Response summary for list views; leaves out the answer payload."""
+    
+    user_email = serializers.EmailField(source="user.email", read_only=True)
+    
+    class Meta:
+        model = Response
+        fields = [
+            "id", "survey", "user", "user_email", "submitted_at",
+            "completion_status", "completion_time_seconds", "validation_status"
+        ]
+        read_only_fields = fields
+
+
+class ResponseSerializer(ResponseListSerializer):
     """Serializer for survey responses."""
     
     survey_title = serializers.CharField(source="survey.title", read_only=True)
-    user_email = serializers.EmailField(source="user.email", read_only=True)
     
     class Meta:
         model = Response
         fields = [
             "id", "survey", "survey_title", "user", "user_email",
-            "data", "submitted_at", "completion_time_seconds"
+            "data", "submitted_at", "completion_status", "completion_time_seconds",
+            "validation_status"
+        ]
+        read_only_fields = [
+            "id", "survey_title", "user_email", "submitted_at", "validation_status"
         ]
-        read_only_fields = ["id", "survey_title", "user_email", "submitted_at"]
+
+
+# Shared formatter so timestamps match DRF's DATETIME_FORMAT and time zone
+_DATETIME_FIELD = serializers.DateTimeField()
+
+
+def _uuid_or_none(value):
+    return None if value is None else str(value)
 
 
 class PartialResponseSerializer(serializers.ModelSerializer):
-    """Serializer for partial (in-progress) responses."""
+    """
+    Serializer for partial (in-progress) responses.
+    Output only, on the heartbeat path: to_representation builds the
+    payload directly instead of binding and walking the fields.
+    """
     
     class Meta:
         model = PartialResponse
@@ -31,6 +59,19 @@ class PartialResponseSerializer(serializers.ModelSerializer):
             "last_section_id", "last_field_id", "started_at", "last_updated"
         ]
         read_only_fields = ["id", "started_at", "last_updated"]
+    
+    def to_representation(self, instance):
+        to_datetime = _DATETIME_FIELD.to_representation
+        return {
+            "id": str(instance.id),
+            "survey": instance.survey_id,
+            "session_token": str(instance.session_token),
+            "data": instance.data,
+            "last_section_id": _uuid_or_none(instance.last_section_id),
+            "last_field_id": _uuid_or_none(instance.last_field_id),
+            "started_at": to_datetime(instance.started_at),
+            "last_updated": to_datetime(instance.last_updated),
+        }
 
 
 class SubmissionSerializer(serializers.Serializer):
@@ -38,9 +79,32 @@ class SubmissionSerializer(serializers.Serializer):
     
     data = serializers.JSONField()
     session_token = serializers.CharField(required=False, allow_blank=True)
+    completion_status = serializers.ChoiceField(
+        choices=CompletionStatus.choices, required=False
+    )
+    completion_time_seconds = serializers.IntegerField(
+        min_value=0, required=False, allow_null=True
+    )
+    
+    def to_internal_value(self, data):
+        """Lift column-backed keys out of the JSONB payload into their own fields."""
+        payload = data.get("data")
+        if isinstance(payload, dict) and any(key in payload for key in Response.DATA_COLUMN_KEYS):
+            data = data.copy()
+            payload = dict(payload)
+            for key in Response.DATA_COLUMN_KEYS:
+                if key in payload:
+                    data.setdefault(key, payload.pop(key))
+            data["data"] = payload
+        return super().to_internal_value(data)
     
     def validate(self, attrs):
-        """Validate submission against logic engine."""
+        """
+        Validate submission against logic engine rules.
+        When the view sets defer_logic (surveys with many visibility
+        conditions) only always-visible fields are checked here; the rest
+        is validated after commit by validate_logic_async.
+        """
         from apps.logic_engine import LogicEngine
         
         survey = self.context.get("survey")
@@ -50,7 +114,10 @@ class SubmissionSerializer(serializers.Serializer):
         engine = LogicEngine(submitted_data)
         
         # Validate submission
-        is_valid, errors = engine.validate_submission(survey, submitted_data)
+        if self.context.get("defer_logic"):
+            is_valid, errors = engine.validate_unconditional_fields(survey, submitted_data)
+        else:
+            is_valid, errors = engine.validate_submission(survey, submitted_data)
         
         if not is_valid:
             raise serializers.ValidationError({"data": errors})
@@ -4,59 +4,283 @@ Maps to FR 3.3: Async Processing.
 """
 import csv
 import io
-from celery import shared_task
-from django.core.mail import send_mail
+import logging
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+from itertools import islice
 
+from celery import chord, shared_task
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import connection
+from django.db.models.fields.json import KeyTextTransform
+from django.urls import reverse
+from django.utils import timezone
 
-@shared_task
-def export_responses_csv(survey_id: str, user_email: str):
+logger = logging.getLogger(__name__)
+
+INVITATION_CHUNK_SIZE = 500
+EXPORT_HEADER_PREFIX = ("Response ID", "User", "Submitted At")
+EXPORT_SHARD_SIZE = 100_000  # responses per parallel export shard
+STREAM_CHUNK_SIZE = 500  # rows per block of a streamed CSV download
+EXPORT_LINK_SALT = "apps.responses.export-link"
+
+
+def export_storage() -> FileSystemStorage:
+    """Private storage for finished exports, outside MEDIA_ROOT and MEDIA_URL."""
+    return FileSystemStorage(location=settings.RESPONSE_EXPORT_ROOT)
+
+
+def _export_rows(survey_id: str, field_ids: list, cutoff=None):
     """
-    Export survey responses to CSV and email to user.
-    Runs asynchronously via Celery.
+    Rows of (id, user email, submitted_at, *answers) in export order.
+    Each answer is projected out of the JSONB column in SQL
+    (data->>'field_id'), so only exported values are transferred.
     """
-    from apps.surveys.models import Survey
     from apps.responses.models import Response
     
-    survey = Survey.objects.get(id=survey_id)
-    responses = Response.objects.filter(survey=survey).select_related("user")
+    answer_columns = {
+        f"answer_{i}": KeyTextTransform(field_id, "data")
+        for i, field_id in enumerate(field_ids)
+    }
+    responses = Response.objects.filter(survey_id=survey_id)
+    if cutoff is not None:
+        responses = responses.filter(submitted_at__lte=cutoff)
+    return responses.annotate(**answer_columns).values_list(
+        "id", "user__email", "submitted_at", *answer_columns
+    ).order_by("submitted_at", "id")
+
+
+def _export_columns(survey_id) -> tuple[list, list]:
+    """Exported field ids and the header row; the cached structure keeps survey order."""
+    from apps.surveys.cache import get_survey_structure
+    
+    field_map = {
+        field.id: field.label
+        for section in get_survey_structure(survey_id)
+        for field in section.fields
+    }
+    return list(field_map), [*EXPORT_HEADER_PREFIX, *field_map.values()]
+
+
+def _csv_row(response_id, email, submitted_at, *answers) -> tuple:
+    """Format one _export_rows row for csv.writer."""
+    # Missing answers come back as NULL, which csv writes as ""
+    return (str(response_id), email or "Anonymous", submitted_at.isoformat(), *answers)
+
+
+def _write_csv(path: str, rows, header=None) -> tuple[str, int]:
+    """
+    Stream rows to a temporary file and save it to export_storage(),
+    never holding it in memory.
+    Returns the saved path and the number of data rows.
+    """
+    count = 0
+    
+    def csv_rows():
+        nonlocal count
+        for row in rows.iterator(chunk_size=2000):
+            count += 1
+            yield _csv_row(*row)
+    
+    with tempfile.TemporaryFile() as tmp:
+        output = io.TextIOWrapper(tmp, encoding="utf-8", newline="")
+        writer = csv.writer(output)
+        if header is not None:
+            writer.writerow(header)
+        # One writerows call keeps the per-row loop inside the csv C module
+        writer.writerows(csv_rows())
+        
+        # Detach flushes the text layer without closing the temp file
+        output.detach()
+        tmp.seek(0)
+        path = export_storage().save(path, File(tmp))
+    
+    return path, count
+
+
+def stream_responses_csv(survey_id, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Yield a survey's CSV export as text for a StreamingHttpResponse:
+    the header, then one rendered block per chunk_size rows.
+    Rows come from a server-side cursor, so memory stays flat for any N.
+    """
+    field_ids, header = _export_columns(survey_id)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
     
-    # Build CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
+    writer.writerow(header)
+    yield flush()
     
-    # Header row
-    fields = survey.sections.prefetch_related("fields").values_list(
-        "fields__id", "fields__label"
+    rows = _export_rows(survey_id, field_ids).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        writer.writerows(_csv_row(*row) for row in chunk)
+        yield flush()
+
+
+def export_download_url(survey_id, user_email: str, export_path: str) -> str:
+    """
+    Absolute link to ResponseViewSet.export_file for a finished export. The
+    signed token names the file and the user it is for; it expires after
+    RESPONSE_EXPORT_LINK_MAX_AGE.
+    """
+    token = signing.dumps(
+        {"survey": str(survey_id), "email": user_email, "path": export_path},
+        salt=EXPORT_LINK_SALT,
     )
-    field_map = {str(fid): label for fid, label in fields if fid}
-    writer.writerow(["Response ID", "User", "Submitted At"] + list(field_map.values()))
-    
-    # Data rows
-    for response in responses:
-        row = [
-            str(response.id),
-            response.user.email if response.user else "Anonymous",
-            response.submitted_at.isoformat(),
-        ]
-        for field_id in field_map.keys():
-            row.append(response.data.get(field_id, ""))
-        writer.writerow(row)
-    
-    csv_content = output.getvalue()
-    
-    # Email the export (simplified - in production, upload to S3 and send link)
+    path = reverse("api:survey-responses-export-file", kwargs={
+        "version": settings.REST_FRAMEWORK["DEFAULT_VERSION"],
+        "survey_pk": str(survey_id),
+        "token": token,
+    })
+    return f"{settings.SITE_URL.rstrip('/')}{path}"
+
+
+def _email_export_link(survey, user_email: str, export_path: str, count: int):
+    """Tell the requesting user where the finished export is."""
     send_mail(
         subject=f"Survey Export: {survey.title}",
-        message=f"Your CSV export for '{survey.title}' is attached.",
+        message=(
+            f"Your CSV export for '{survey.title}' ({count} responses) is ready: "
+            f"{export_download_url(survey.id, user_email, export_path)}"
+        ),
         from_email="noreply@adsp.example.com",
         recipient_list=[user_email],
-        html_message=f"<p>Export data:</p><pre>{csv_content[:1000]}...</pre>"
     )
+
+
+def _export_shard_bounds(survey_id: str, cutoff) -> list:
+    """
+    Keyset boundaries splitting a survey's responses into EXPORT_SHARD_SIZE
+    shards: the (submitted_at, id) of every shard's first row but the first.
+    """
+    from django.db.models import F, Window
+    from django.db.models.functions import Mod, RowNumber
+    from apps.responses.models import Response
     
-    return f"Exported {responses.count()} responses"
+    position = Window(
+        RowNumber(), order_by=(F("submitted_at").asc(), F("id").asc())
+    ) - 1
+    return [
+        (submitted_at.isoformat(), str(response_id))
+        for submitted_at, response_id in Response.objects.filter(
+            survey_id=survey_id, submitted_at__lte=cutoff
+        ).annotate(
+            position=position,
+            shard_offset=Mod(position, EXPORT_SHARD_SIZE),
+        ).filter(
+            position__gt=0, shard_offset=0
+        ).values_list("submitted_at", "id").order_by("submitted_at", "id")
+    ]
 
 
+@shared_task(ignore_result=True)
+def export_responses_csv(survey_id: str, user_email: str):
+    """
+    Export survey responses to CSV and email a download link to the user.
+    Surveys with more than EXPORT_SHARD_SIZE responses are exported in
+    parallel shards (export_responses_csv_shard) joined by
+    finalize_responses_csv_export.
+    Runs asynchronously via Celery.
+    """
+    from apps.surveys.models import Survey
+    from apps.responses.models import Response
+    
+    survey = Survey.objects.get(id=survey_id)
+    field_ids, header = _export_columns(survey_id)
+    export_path = f"exports/{survey_id}/{timezone.now():%Y%m%d%H%M%S}.csv"
+    
+    # Responses submitted after this point are left out of every shard
+    cutoff = timezone.now()
+    total = Response.objects.filter(survey_id=survey_id, submitted_at__lte=cutoff).count()
+    
+    if total <= EXPORT_SHARD_SIZE:
+        export_path, count = _write_csv(
+            export_path, _export_rows(survey_id, field_ids, cutoff), header
+        )
+        _email_export_link(survey, user_email, export_path, count)
+        return f"Exported {count} responses"
+    
+    bounds = _export_shard_bounds(survey_id, cutoff)
+    lowers, uppers = [None, *bounds], [*bounds, None]
+    chord(
+        export_responses_csv_shard.s(
+            survey_id, field_ids, cutoff.isoformat(), lower, upper, f"{export_path}.part{part}"
+        )
+        for part, (lower, upper) in enumerate(zip(lowers, uppers))
+    )(finalize_responses_csv_export.s(survey_id, user_email, header, export_path))
+    
+    return f"Exporting {total} responses in {len(lowers)} shards"
+
+
+# Keeps its result: the chord hands (path, count) to the finalize callback
 @shared_task
+def export_responses_csv_shard(
+    survey_id: str, field_ids: list, cutoff: str, lower, upper, part_path: str
+):
+    """
+    Write one shard of a large export, without header, to part_path.
+    lower (inclusive) and upper (exclusive) are (submitted_at, id) keyset
+    bounds from _export_shard_bounds; None leaves that side open.
+    """
+    from django.db.models import Q
+    
+    rows = _export_rows(survey_id, field_ids, datetime.fromisoformat(cutoff))
+    if lower is not None:
+        submitted_at, response_id = datetime.fromisoformat(lower[0]), lower[1]
+        rows = rows.filter(
+            Q(submitted_at__gt=submitted_at) | Q(submitted_at=submitted_at, id__gte=response_id)
+        )
+    if upper is not None:
+        submitted_at, response_id = datetime.fromisoformat(upper[0]), upper[1]
+        rows = rows.filter(
+            Q(submitted_at__lt=submitted_at) | Q(submitted_at=submitted_at, id__lt=response_id)
+        )
+    
+    return _write_csv(part_path, rows)
+
+
+@shared_task(ignore_result=True)
+def finalize_responses_csv_export(
+    parts: list, survey_id: str, user_email: str, header: list, export_path: str
+):
+    """
+    Chord callback: concatenate the shard files behind the header row,
+    in shard order, then delete the parts and email the download link.
+    """
+    from apps.surveys.models import Survey
+    
+    storage = export_storage()
+    with tempfile.TemporaryFile() as tmp:
+        output = io.TextIOWrapper(tmp, encoding="utf-8", newline="")
+        csv.writer(output).writerow(header)
+        output.detach()
+        for part_path, _ in parts:
+            with storage.open(part_path, "rb") as part:
+                shutil.copyfileobj(part, tmp)
+        tmp.seek(0)
+        export_path = storage.save(export_path, File(tmp))
+    
+    for part_path, _ in parts:
+        storage.delete(part_path)
+    
+    count = sum(part_count for _, part_count in parts)
+    _email_export_link(Survey.objects.get(id=survey_id), user_email, export_path, count)
+    return f"Exported {count} responses"
+
+
+@shared_task(ignore_result=True)
 def send_survey_invitation_batch(survey_id: str, email_list: list[str]):
     """
     Send survey invitation emails in batch.
@@ -66,29 +290,137 @@ def send_survey_invitation_batch(survey_id: str, email_list: list[str]):
     
     survey = Survey.objects.get(id=survey_id)
     survey_url = f"https://adsp.example.com/s/{survey_id}"
+    subject = f"You're invited: {survey.title}"
+    body = f"Please complete this survey: {survey_url}"
     
-    for email in email_list:
-        send_mail(
-            subject=f"You're invited: {survey.title}",
-            message=f"Please complete this survey: {survey_url}",
-            from_email="noreply@adsp.example.com",
-            recipient_list=[email],
-        )
+    # One SMTP connection for the whole batch, messages built per chunk
+    with get_connection() as connection:
+        for start in range(0, len(email_list), INVITATION_CHUNK_SIZE):
+            connection.send_messages([
+                EmailMessage(
+                    subject=subject,
+                    body=body,
+                    from_email="noreply@adsp.example.com",
+                    to=[email],
+                    connection=connection,
+                )
+                for email in email_list[start:start + INVITATION_CHUNK_SIZE]
+            ])
     
     return f"Sent {len(email_list)} invitations"
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def cleanup_stale_partial_responses(days_old: int = 30):
     """
     Remove partial responses older than specified days.
     Scheduled task for data hygiene.
+    Nothing references partial_responses and it has no delete signals, so a
+    single DELETE (using the last_updated index) replaces the ORM collector's
+    fetch-then-delete batches.
     """
     from datetime import timedelta
-    from django.utils import timezone
     from apps.responses.models import PartialResponse
     
     cutoff = timezone.now() - timedelta(days=days_old)
-    deleted_count, _ = PartialResponse.objects.filter(last_updated__lt=cutoff).delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {PartialResponse._meta.db_table} WHERE last_updated < %s",
+            [cutoff],
+        )
+        deleted_count = cursor.rowcount
     
     return f"Deleted {deleted_count} stale partial responses"
+
+
+@shared_task(ignore_result=True)
+def delete_partial_response(survey_id: str, session_token: str):
+    """
+    Drop the saved progress that a submission completed.
+    Enqueued by SubmitView once the response is committed, keeping the
+    DELETE off the request path.
+    """
+    from apps.responses.cache import invalidate_saved_partial
+    from apps.responses.models import PartialResponse, session_token_uuid
+    
+    session_token = session_token_uuid(session_token)
+    PartialResponse.objects.filter(survey_id=survey_id, session_token=session_token).delete()
+    invalidate_saved_partial(survey_id, session_token)
+
+
+def response_field_index_name(field_id) -> str:
+    """Name of the expression index on responses (data->>'<field id>')."""
+    return f"idx_responses_data_{uuid.UUID(str(field_id)).hex}"
+
+
+@shared_task(ignore_result=True)
+def sync_response_field_index(field_id: str, filterable: bool):
+    """
+    Create or drop the BTREE expression index for a filterable field.
+    GIN on data only serves containment; equality, range and sort on a
+    single answer need an index on the extracted value itself.
+    CONCURRENTLY cannot run in a transaction, hence a task, not a migration.
+    responses is partitioned (migration 0010), and a partitioned table takes
+    no CONCURRENTLY index: the parent index is created ON ONLY responses
+    and each partition's index is built concurrently, then attached.
+    The index is partial on the field's survey, so other surveys' rows are
+    neither stored in it nor maintained by it on INSERT.
+    """
+    from apps.surveys.models import Field
+    
+    if connection.vendor != "postgresql":
+        return
+    
+    # DDL cannot take parameters; the UUID round-trips make these safe to inline
+    key = str(uuid.UUID(str(field_id)))
+    index_name = response_field_index_name(key)
+    with connection.cursor() as cursor:
+        if not filterable:
+            # Dropping the parent index drops every partition's index with it
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+            return
+        
+        survey_id = Field.objects.filter(id=key).values_list("section__survey_id", flat=True).first()
+        if survey_id is None:
+            # Deleted before the task ran; its post_delete queued the drop
+            return
+        expression = f"((data->>'{key}')) WHERE survey_id = '{uuid.UUID(str(survey_id))}'"
+        
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON ONLY responses {expression}")
+        cursor.execute(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'responses'::regclass ORDER BY 1"
+        )
+        # Hash partitioning puts the survey in one partition, but the parent
+        # index is only valid once every partition has a matching index
+        for (partition,) in cursor.fetchall():
+            partition_index = f"{index_name}_{partition.removeprefix('responses_')}"
+            cursor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                f"ON {partition} {expression}"
+            )
+            cursor.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
+
+
+@shared_task(ignore_result=True)
+def validate_logic_async(response_id: str):
+    """
+    Run the full conditional-logic validation for a submitted response
+    and record the outcome in validation_status.
+    Deferred from SubmitView for surveys with more visibility conditions
+    than LOGIC_DEFERRED_VALIDATION_THRESHOLD.
+    """
+    from apps.logic_engine import LogicEngine
+    from apps.responses.models import Response, ValidationStatus
+    from apps.surveys.cache import get_survey_structure
+    
+    response = Response.objects.only("id", "survey_id", "data").get(id=response_id)
+    structure = get_survey_structure(response.survey_id)
+    
+    is_valid, errors = LogicEngine(response.data).validate_submission(structure, response.data)
+    if not is_valid:
+        logger.warning("Response %s failed logic validation: %s", response_id, errors)
+    
+    Response.objects.filter(id=response_id).update(
+        validation_status=ValidationStatus.VALID if is_valid else ValidationStatus.INVALID
+    )
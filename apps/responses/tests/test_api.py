@@ -1,12 +1,12 @@
 """Integration tests for Response API endpoints."""
+import json
 import uuid
 from conftest import create_user_with_group
-from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
+from apps.users.models import SURVEY_ADMIN_GROUP
 
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.test import APIClient
 
 from apps.responses.models import PartialResponse, Response
 from apps.surveys.models import Field, FieldType, Section, Survey
@@ -18,11 +18,6 @@ User = get_user_model()
 class TestPartialSaveAPI:
     """Test partial save (heartbeat) endpoint."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
     @pytest.fixture
     def survey(self):
         """Create a test survey."""
@@ -105,6 +100,35 @@ class TestPartialSaveAPI:
         # Verify only one partial exists
         assert PartialResponse.objects.filter(survey=survey, session_token=session_token).count() == 1
     
+    def test_partial_save_upserts_in_one_query(self, api_client, survey, django_assert_num_queries):
+        """Test a cold heartbeat costs one survey check and one upsert."""
+        session_token = str(uuid.uuid4())
+        PartialResponse.objects.create(survey=survey, session_token=session_token)
+        
+        with django_assert_num_queries(2):
+            response = api_client.post(
+                f"/api/v1/surveys/{survey.id}/partial/",
+                {"session_token": session_token, "data": {"field1": "beat"}},
+                format="json"
+            )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert PartialResponse.objects.get(session_token=session_token).data == {"field1": "beat"}
+    
+    def test_unchanged_heartbeat_skips_write(self, api_client, survey, django_assert_num_queries):
+        """Test repeating the last saved state answers from cache without an upsert."""
+        heartbeat = {"session_token": str(uuid.uuid4()), "data": {"field1": "idle"}}
+        first = api_client.post(f"/api/v1/surveys/{survey.id}/partial/", heartbeat, format="json")
+        
+        # Survey active flag and saved state both come from cache
+        with django_assert_num_queries(0):
+            second = api_client.post(
+                f"/api/v1/surveys/{survey.id}/partial/", heartbeat, format="json"
+            )
+        
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data["partial_response"] == first.data["partial_response"]
+    
     def test_retrieve_partial_response(self, api_client, survey):
         """Test retrieving an existing partial response."""
         session_token = str(uuid.uuid4())
@@ -122,6 +146,27 @@ class TestPartialSaveAPI:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["data"] == {"field1": "saved value"}
     
+    def test_retrieve_partial_response_not_modified(self, api_client, survey):
+        """Test revalidating with the ETag returns 304 until the partial changes."""
+        session_token = str(uuid.uuid4())
+        PartialResponse.objects.create(survey=survey, session_token=session_token)
+        url = f"/api/v1/surveys/{survey.id}/partial/?session_token={session_token}"
+        
+        etag = api_client.get(url)["ETag"]
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        
+        api_client.post(
+            f"/api/v1/surveys/{survey.id}/partial/",
+            {"session_token": session_token, "data": {"field1": "changed"}},
+            format="json"
+        )
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+    
     def test_retrieve_partial_response_not_found(self, api_client, survey):
         """Test retrieving non-existent partial response."""
         response = api_client.get(
@@ -155,11 +200,6 @@ class TestPartialSaveAPI:
 class TestSubmitAPI:
     """Test survey submission endpoint."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
     @pytest.fixture
     def survey(self):
         """Create a test survey with fields."""
@@ -220,6 +260,33 @@ class TestSubmitAPI:
         survey_response = Response.objects.get(id=response.data["id"])
         assert survey_response.data[str(name_field.id)] == "John Doe"
         assert survey_response.data[str(email_field.id)] == "john@example.com"
+        assert json.loads(survey_response.encrypted_data) == {
+            str(email_field.id): "john@example.com"
+        }
+    
+    def test_submit_reads_structure_from_cache(self, api_client, survey):
+        """Test a warm survey is validated without survey, section or field queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.surveys.cache import get_survey_structure, is_survey_active
+        
+        get_survey_structure(survey.id)
+        is_survey_active(survey.id)
+        name_field = survey.sections.first().fields.get(order=0)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(
+                f"/api/v1/surveys/{survey.id}/submit/",
+                {"data": {str(name_field.id): "John Doe"}},
+                format="json"
+            )
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert not [
+            query["sql"] for query in queries.captured_queries
+            if '"fields"' in query["sql"] or '"sections"' in query["sql"]
+            or 'FROM "surveys"' in query["sql"]
+        ]
     
     def test_submit_missing_required_field(self, api_client, survey):
         """Test submission fails when required field is missing."""
@@ -241,16 +308,12 @@ class TestSubmitAPI:
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
     
-    def test_submit_cleans_up_partial_response(self, api_client, survey):
-        """Test submission deletes associated partial response."""
+    def test_submit_cleans_up_partial_response(
+        self, api_client, survey, mocker, django_capture_on_commit_callbacks
+    ):
+        """Test submission enqueues deletion of the partial response after commit."""
         session_token = str(uuid.uuid4())
-        
-        # Create partial response
-        PartialResponse.objects.create(
-            survey=survey,
-            session_token=session_token,
-            data={"field1": "partial"}
-        )
+        delay = mocker.patch("apps.responses.views.delete_partial_response.delay")
         
         section = survey.sections.first()
         name_field = section.fields.get(order=0)
@@ -262,19 +325,15 @@ class TestSubmitAPI:
             }
         }
         
-        response = api_client.post(
-            f"/api/v1/surveys/{survey.id}/submit/",
-            data,
-            format="json"
-        )
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                f"/api/v1/surveys/{survey.id}/submit/",
+                data,
+                format="json"
+            )
         
         assert response.status_code == status.HTTP_201_CREATED
-        
-        # Verify partial response was deleted
-        assert not PartialResponse.objects.filter(
-            survey=survey,
-            session_token=session_token
-        ).exists()
+        delay.assert_called_once_with(str(survey.id), session_token)
     
     def test_submit_inactive_survey(self, api_client):
         """Test submission fails for inactive survey."""
@@ -317,43 +376,101 @@ class TestSubmitAPI:
         
         survey_response = Response.objects.get(id=response.data["id"])
         assert survey_response.user is None
+    
+    def test_submit_moves_completion_keys_to_columns(self, api_client, survey):
+        """Test completion keys in data are stored in their own columns."""
+        name_field = survey.sections.first().fields.get(order=0)
+        
+        data = {
+            "data": {
+                str(name_field.id): "John Doe",
+                "completion_status": "screened_out",
+                "completion_time_seconds": 95
+            }
+        }
+        
+        response = api_client.post(
+            f"/api/v1/surveys/{survey.id}/submit/",
+            data,
+            format="json"
+        )
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        
+        survey_response = Response.objects.get(id=response.data["id"])
+        assert survey_response.completion_status == "screened_out"
+        assert survey_response.completion_time_seconds == 95
+        assert survey_response.data == {str(name_field.id): "John Doe"}
+    
+    def test_submit_validates_conditional_logic(
+        self, api_client, survey_with_logic, mocker, django_capture_on_commit_callbacks
+    ):
+        """Test a survey with a few rules is fully validated during the request."""
+        delay = mocker.patch("apps.responses.views.validate_logic_async.delay")
+        country_field = survey_with_logic.sections.get(order=0).fields.get()
+        state_field = survey_with_logic.sections.get(order=1).fields.get()
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                f"/api/v1/surveys/{survey_with_logic.id}/submit/",
+                {"data": {str(country_field.id): "other", str(state_field.id): "ca"}},
+                format="json"
+            )
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["data"] == ["Field 'State' should not have data (hidden by logic)"]
+        assert not Response.objects.filter(survey=survey_with_logic).exists()
+        delay.assert_not_called()
+    
+    def test_submit_defers_heavy_conditional_logic(
+        self, api_client, survey_with_logic, settings, mocker, django_capture_on_commit_callbacks
+    ):
+        """Test rules are validated after commit above the condition threshold."""
+        settings.LOGIC_DEFERRED_VALIDATION_THRESHOLD = 0
+        delay = mocker.patch("apps.responses.views.validate_logic_async.delay")
+        country_field = survey_with_logic.sections.get(order=0).fields.get()
+        state_field = survey_with_logic.sections.get(order=1).fields.get()
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                f"/api/v1/surveys/{survey_with_logic.id}/submit/",
+                {"data": {str(country_field.id): "other", str(state_field.id): "ca"}},
+                format="json"
+            )
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        
+        survey_response = Response.objects.get(id=response.data["id"])
+        assert survey_response.validation_status == "pending"
+        delay.assert_called_once_with(str(survey_response.id))
 
 
 @pytest.mark.django_db
 class TestResponseViewSetAPI:
     """Test Response viewing endpoints."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
     @pytest.fixture
     def survey(self, admin_user):
         """Create a test survey."""
         return Survey.objects.create(title="Test Survey", owner=admin_user, is_active=True)
     
-    def test_list_responses(self, api_client, admin_user, survey):
+    def test_list_responses(self, api_client, admin_user, survey, django_assert_num_queries):
         """Test listing responses for a survey."""
         api_client.force_authenticate(user=admin_user)
         
-        Response.objects.create(survey=survey, data={"field1": "value1"})
-        Response.objects.create(survey=survey, data={"field1": "value2"})
+        Response.objects.bulk_create([
+            Response(survey=survey, data={"field1": "value1"}),
+            Response(survey=survey, user=admin_user, data={"field1": "value2"}),
+        ])
         
-        response = api_client.get(f"/api/v1/surveys/{survey.id}/responses/")
+        # Permission group check and page rows - no count, none per response
+        with django_assert_num_queries(2):
+            response = api_client.get(f"/api/v1/surveys/{survey.id}/responses/")
         
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 2
+        assert {r.get("user_email") for r in response.data["results"]} == {"admin@example.com", None}
+        assert "data" not in response.data["results"][0]
     
     def test_retrieve_response(self, api_client, admin_user, survey):
         """Test retrieving a specific response."""
@@ -385,3 +502,53 @@ class TestResponseViewSetAPI:
         
         assert response.status_code == status.HTTP_202_ACCEPTED
         assert "Export started" in response.data["message"]
+    
+    def test_download_streams_csv(self, api_client, admin_user, survey):
+        """Test the synchronous download streams the CSV."""
+        api_client.force_authenticate(user=admin_user)
+        Response.objects.create(survey=survey, user=admin_user, data={})
+        Response.objects.create(survey=survey, data={})
+        
+        response = api_client.get(f"/api/v1/surveys/{survey.id}/responses/download/")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == "Response ID,User,Submitted At"
+        assert [line.split(",")[1] for line in lines[1:]] == ["admin@example.com", "Anonymous"]
+    
+    def test_export_link_serves_the_requester_only(
+        self, api_client, admin_user, analyst_user, survey, settings, tmp_path, mailoutbox
+    ):
+        """Test the emailed export link is absolute and works only for the requesting user."""
+        from urllib.parse import urlsplit
+        from apps.responses.tasks import export_responses_csv
+        
+        settings.RESPONSE_EXPORT_ROOT = tmp_path
+        Response.objects.create(survey=survey, data={})
+        export_responses_csv(str(survey.id), admin_user.email)
+        link = mailoutbox[0].body.rsplit(": ", 1)[1]
+        assert link.startswith(settings.SITE_URL)
+        
+        api_client.force_authenticate(user=analyst_user)
+        assert api_client.get(urlsplit(link).path).status_code == status.HTTP_404_NOT_FOUND
+        
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.get(urlsplit(link).path)
+        assert response.status_code == status.HTTP_200_OK
+        assert b"".join(response.streaming_content).decode().startswith("Response ID,")
+        
+        settings.RESPONSE_EXPORT_LINK_MAX_AGE = -1
+        assert api_client.get(urlsplit(link).path).status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_download_refuses_large_surveys(self, api_client, admin_user, survey, settings):
+        """Test surveys above the download limit are pointed at the async export."""
+        settings.RESPONSE_DOWNLOAD_MAX_ROWS = 1
+        api_client.force_authenticate(user=admin_user)
+        Response.objects.bulk_create([Response(survey=survey, data={}) for _ in range(2)])
+        
+        response = api_client.get(f"/api/v1/surveys/{survey.id}/responses/download/")
+        
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert response.data["export_url"].endswith(f"/surveys/{survey.id}/responses/export/")
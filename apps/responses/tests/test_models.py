@@ -1,32 +1,39 @@
 """Unit tests for Response and PartialResponse models."""
+import uuid
+
 import pytest
 from django.contrib.auth import get_user_model
-from conftest import create_user_with_group
-from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
 
 from apps.responses.models import PartialResponse, Response
 from apps.surveys.models import Field, FieldType, Section, Survey
 
 User = get_user_model()
 
+SESSION_TOKEN = uuid.UUID("abc123de-f456-4a1b-9c2d-3e4f5a6b7c8d")
+
+
+@pytest.fixture(scope="module")
+def admin_user(shared_admin_user):
+    """The conftest module admin; tests roll back around it."""
+    return shared_admin_user
+
+
+@pytest.fixture(scope="module")
+def survey(admin_user, django_db_blocker):
+    """Survey owned by admin_user, deleted with it at module teardown."""
+    with django_db_blocker.unblock():
+        return Survey.objects.create(title="Test Survey", owner=admin_user)
+
 
 @pytest.mark.django_db
 class TestResponseModel:
     """Test Response model functionality."""
     
-    def test_create_response(self):
+    def test_create_response(self, admin_user, survey):
         """Test creating a response."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         response = Response.objects.create(
             survey=survey,
-            user=user,
+            user=admin_user,
             data={"field1": "value1", "field2": "value2"},
             ip_address="192.168.1.1",
             user_agent="Mozilla/5.0"
@@ -34,20 +41,12 @@ class TestResponseModel:
         
         assert response.id is not None
         assert response.survey == survey
-        assert response.user == user
+        assert response.user == admin_user
         assert response.data == {"field1": "value1", "field2": "value2"}
         assert response.ip_address == "192.168.1.1"
     
-    def test_create_anonymous_response(self):
+    def test_create_anonymous_response(self, admin_user, survey):
         """Test creating an anonymous response."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         response = Response.objects.create(
             survey=survey,
             user=None,
@@ -57,16 +56,8 @@ class TestResponseModel:
         assert response.user is None
         assert str(response) == "Response to Test Survey by Anonymous"
     
-    def test_response_encrypted_data(self):
+    def test_response_encrypted_data(self, admin_user, survey):
         """Test storing encrypted data."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         response = Response.objects.create(
             survey=survey,
             data={"field1": "public"},
@@ -75,16 +66,15 @@ class TestResponseModel:
         
         assert response.encrypted_data == "encrypted_sensitive_data"
     
-    def test_response_completion_time(self):
-        """Test storing completion time."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
+    def test_encrypted_data_deferred_by_default(self, admin_user, survey):
+        """Test encrypted_data is only loaded when asked for."""
+        response = Response.objects.create(survey=survey, encrypted_data="secret")
         
+        assert Response.objects.get(id=response.id).get_deferred_fields() == {"encrypted_data"}
+        assert Response.objects.only("encrypted_data").get(id=response.id).encrypted_data == "secret"
+    
+    def test_response_completion_time(self, admin_user, survey):
+        """Test storing completion time."""
         response = Response.objects.create(
             survey=survey,
             data={},
@@ -93,34 +83,20 @@ class TestResponseModel:
         
         assert response.completion_time_seconds == 120
     
-    def test_response_cascade_delete(self):
+    def test_response_cascade_delete(self, admin_user, survey):
         """Test responses are deleted when survey is deleted."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
         response = Response.objects.create(survey=survey, data={})
         
-        survey.delete()
+        Survey.objects.filter(id=survey.id).delete()
         
         assert not Response.objects.filter(id=response.id).exists()
     
-    def test_response_ordering(self):
+    def test_response_ordering(self, admin_user, survey):
         """Test responses are ordered by submitted_at descending."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
+        # One INSERT; auto_now_add stamps the rows in list order
+        response1, response2, response3 = Response.objects.bulk_create(
+            [Response(survey=survey, data={"order": i}) for i in (1, 2, 3)]
         )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
-        response1 = Response.objects.create(survey=survey, data={"order": 1})
-        response2 = Response.objects.create(survey=survey, data={"order": 2})
-        response3 = Response.objects.create(survey=survey, data={"order": 3})
         
         responses = list(Response.objects.all())
         assert responses[0] == response3
@@ -132,55 +108,32 @@ class TestResponseModel:
 class TestPartialResponseModel:
     """Test PartialResponse model functionality."""
     
-    def test_create_partial_response(self):
+    def test_create_partial_response(self, admin_user, survey):
         """Test creating a partial response."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         partial = PartialResponse.objects.create(
             survey=survey,
-            session_token="abc123",
+            session_token=SESSION_TOKEN,
             data={"field1": "partial value"}
         )
         
         assert partial.id is not None
         assert partial.survey == survey
-        assert partial.session_token == "abc123"
+        assert partial.session_token == SESSION_TOKEN
         assert partial.data == {"field1": "partial value"}
     
-    def test_partial_response_with_user(self):
+    def test_partial_response_with_user(self, admin_user, survey):
         """Test partial response with authenticated user."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         partial = PartialResponse.objects.create(
             survey=survey,
-            session_token="abc123",
-            user=user,
+            session_token=SESSION_TOKEN,
+            user=admin_user,
             data={}
         )
         
-        assert partial.user == user
+        assert partial.user == admin_user
     
-    def test_partial_response_progress_tracking(self):
+    def test_partial_response_progress_tracking(self, admin_user, survey):
         """Test tracking progress with section/field IDs."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
         section = Section.objects.create(survey=survey, title="Section 1")
         field = Field.objects.create(
             section=section,
@@ -190,7 +143,7 @@ class TestPartialResponseModel:
         
         partial = PartialResponse.objects.create(
             survey=survey,
-            session_token="abc123",
+            session_token=SESSION_TOKEN,
             data={},
             last_section_id=section.id,
             last_field_id=field.id
@@ -199,19 +152,11 @@ class TestPartialResponseModel:
         assert partial.last_section_id == section.id
         assert partial.last_field_id == field.id
     
-    def test_unique_survey_session_constraint(self):
+    def test_unique_survey_session_constraint(self, admin_user, survey):
         """Test unique constraint on survey + session_token."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         PartialResponse.objects.create(
             survey=survey,
-            session_token="abc123",
+            session_token=SESSION_TOKEN,
             data={}
         )
         
@@ -220,24 +165,16 @@ class TestPartialResponseModel:
         with pytest.raises(IntegrityError):
             PartialResponse.objects.create(
                 survey=survey,
-                session_token="abc123",
+                session_token=SESSION_TOKEN,
                 data={}
             )
     
-    def test_update_or_create_partial_response(self):
+    def test_update_or_create_partial_response(self, admin_user, survey):
         """Test updating existing partial response."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         # Create initial
         partial1, created1 = PartialResponse.objects.update_or_create(
             survey=survey,
-            session_token="abc123",
+            session_token=SESSION_TOKEN,
             defaults={"data": {"field1": "value1"}}
         )
         
@@ -247,7 +184,7 @@ class TestPartialResponseModel:
         # Update existing
         partial2, created2 = PartialResponse.objects.update_or_create(
             survey=survey,
-            session_token="abc123",
+            session_token=SESSION_TOKEN,
             defaults={"data": {"field1": "updated", "field2": "new"}}
         )
         
@@ -255,39 +192,38 @@ class TestPartialResponseModel:
         assert partial2.id == partial1.id
         assert partial2.data == {"field1": "updated", "field2": "new"}
     
-    def test_partial_response_string_representation(self):
+    def test_upsert_reports_the_stored_row(self, admin_user, survey):
+        """Test upsert inserts once, then updates in place and returns the stored row."""
+        partial1, created1 = PartialResponse.upsert(survey.id, SESSION_TOKEN, data={"field1": "value1"})
+        partial2, created2 = PartialResponse.upsert(
+            survey.id, SESSION_TOKEN, data={"field1": "updated"}, user_id=admin_user.id
+        )
+        
+        stored = PartialResponse.objects.get(survey=survey, session_token=SESSION_TOKEN)
+        assert (created1, created2) == (True, False)
+        assert partial1.id == partial2.id == stored.id
+        assert partial2.started_at == partial1.started_at == stored.started_at
+        assert stored.data == {"field1": "updated"}
+        assert stored.user_id == admin_user.id
+    
+    def test_partial_response_string_representation(self, admin_user, survey):
         """Test string representation."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         partial = PartialResponse.objects.create(
             survey=survey,
-            session_token="abc123def456",
+            session_token=SESSION_TOKEN,
             data={}
         )
         
         assert str(partial) == "Partial: Test Survey - abc123de..."
     
-    def test_partial_response_cascade_delete(self):
+    def test_partial_response_cascade_delete(self, admin_user, survey):
         """Test partial responses are deleted when survey is deleted."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
         partial = PartialResponse.objects.create(
             survey=survey,
-            session_token="abc123",
+            session_token=SESSION_TOKEN,
             data={}
         )
         
-        survey.delete()
+        Survey.objects.filter(id=survey.id).delete()
         
         assert not PartialResponse.objects.filter(id=partial.id).exists()
@@ -0,0 +1,205 @@
+"""Tests for Response Celery tasks."""
+import csv
+import io
+import uuid
+
+import pytest
+from django.db import connection
+
+from apps.responses.models import PartialResponse, Response
+from apps.responses.tasks import (
+    cleanup_stale_partial_responses,
+    delete_partial_response,
+    export_responses_csv,
+    export_storage,
+    response_field_index_name,
+    send_survey_invitation_batch,
+    sync_response_field_index,
+    validate_logic_async,
+)
+
+
+@pytest.mark.django_db
+class TestExportResponsesCSV:
+    """Test CSV export task."""
+    
+    @pytest.fixture(autouse=True)
+    def export_root(self, settings, tmp_path):
+        """Write exports to a temporary private root."""
+        settings.RESPONSE_EXPORT_ROOT = tmp_path
+    
+    def _export_path(self, message):
+        """The export file named by the signed link in an export email."""
+        from django.core import signing
+        from apps.responses.tasks import EXPORT_LINK_SALT
+        
+        link = message.body.rsplit(": ", 1)[1]
+        assert link.startswith("http")
+        token = link.rstrip("/").rsplit("/", 1)[1]
+        return signing.loads(token, salt=EXPORT_LINK_SALT)["path"]
+    
+    def test_export_writes_csv_and_emails_link(self, complete_survey, admin_user, mailoutbox):
+        name_field = complete_survey.sections.get(order=0).fields.get(order=0)
+        Response.objects.create(
+            survey=complete_survey,
+            user=admin_user,
+            data={str(name_field.id): "John Doe"}
+        )
+        Response.objects.create(survey=complete_survey, data={})
+        
+        result = export_responses_csv(str(complete_survey.id), "analyst@example.com")
+        
+        assert result == "Exported 2 responses"
+        assert len(mailoutbox) == 1
+        assert mailoutbox[0].to == ["analyst@example.com"]
+        
+        export_path = self._export_path(mailoutbox[0])
+        with export_storage().open(export_path) as f:
+            rows = list(csv.reader(io.TextIOWrapper(f, encoding="utf-8")))
+        
+        assert rows[0][:4] == ["Response ID", "User", "Submitted At", "Full Name"]
+        assert len(rows[0]) == 3 + 6
+        assert rows[1][1] == "admin@example.com"
+        assert rows[1][3] == "John Doe"
+        assert rows[2][1] == "Anonymous"
+    
+    def test_large_export_is_sharded(self, complete_survey, mailoutbox, mocker):
+        from config import celery_app
+        
+        mocker.patch("apps.responses.tasks.EXPORT_SHARD_SIZE", 2)
+        mocker.patch.object(celery_app.conf, "task_always_eager", True)
+        name_field = complete_survey.sections.get(order=0).fields.get(order=0)
+        created = Response.objects.bulk_create(
+            [Response(survey=complete_survey, data={str(name_field.id): f"R{i}"}) for i in range(5)]
+        )
+        
+        result = export_responses_csv(str(complete_survey.id), "analyst@example.com")
+        
+        assert result == "Exporting 5 responses in 3 shards"
+        assert "(5 responses)" in mailoutbox[0].body
+        
+        export_path = self._export_path(mailoutbox[0])
+        with export_storage().open(export_path) as f:
+            rows = list(csv.reader(io.TextIOWrapper(f, encoding="utf-8")))
+        
+        assert rows[0][0] == "Response ID"
+        assert [row[0] for row in rows[1:]] == [
+            str(r.id) for r in sorted(created, key=lambda r: (r.submitted_at, str(r.id)))
+        ]
+        assert export_storage().listdir(f"exports/{complete_survey.id}")[1] == [
+            export_path.rsplit("/", 1)[1]
+        ]
+
+
+@pytest.mark.django_db
+class TestSendSurveyInvitationBatch:
+    """Test batched invitation emails."""
+    
+    def test_sends_one_message_per_recipient_over_one_connection(self, sample_survey, mailoutbox, mocker):
+        from apps.responses import tasks
+        
+        spy = mocker.spy(tasks, "get_connection")
+        emails = [f"user{i}@example.com" for i in range(3)]
+        
+        result = send_survey_invitation_batch(str(sample_survey.id), emails)
+        
+        assert result == "Sent 3 invitations"
+        assert [m.to for m in mailoutbox] == [[e] for e in emails]
+        assert spy.call_count == 1
+
+
+@pytest.mark.django_db
+class TestCleanupStalePartialResponses:
+    """Test stale partial response cleanup."""
+    
+    def test_deletes_only_stale_partials(self, sample_survey):
+        from datetime import timedelta
+        from django.utils import timezone
+        
+        stale = PartialResponse.objects.create(survey=sample_survey, session_token=uuid.uuid4())
+        fresh = PartialResponse.objects.create(survey=sample_survey, session_token=uuid.uuid4())
+        PartialResponse.objects.filter(id=stale.id).update(
+            last_updated=timezone.now() - timedelta(days=31)
+        )
+        
+        result = cleanup_stale_partial_responses(days_old=30)
+        
+        assert result == "Deleted 1 stale partial responses"
+        assert list(PartialResponse.objects.values_list("id", flat=True)) == [fresh.id]
+
+
+@pytest.mark.django_db
+class TestDeletePartialResponse:
+    """Test removal of the partial response a submission completed."""
+    
+    def test_deletes_only_matching_session(self, sample_survey):
+        session_token = uuid.uuid4()
+        PartialResponse.objects.create(survey=sample_survey, session_token=session_token)
+        other = PartialResponse.objects.create(survey=sample_survey, session_token=uuid.uuid4())
+        
+        delete_partial_response(str(sample_survey.id), str(session_token))
+        
+        assert list(PartialResponse.objects.values_list("id", flat=True)) == [other.id]
+
+
+@pytest.mark.django_db
+class TestValidateLogicAsync:
+    """Test deferred conditional-logic validation."""
+    
+    def test_marks_hidden_field_data_invalid(self, survey_with_logic):
+        country_field = survey_with_logic.sections.get(order=0).fields.get()
+        state_field = survey_with_logic.sections.get(order=1).fields.get()
+        response = Response.objects.create(
+            survey=survey_with_logic,
+            data={str(country_field.id): "other", str(state_field.id): "ca"}
+        )
+        
+        validate_logic_async(str(response.id))
+        
+        response.refresh_from_db()
+        assert response.validation_status == "invalid"
+    
+    def test_marks_visible_data_valid(self, survey_with_logic):
+        country_field = survey_with_logic.sections.get(order=0).fields.get()
+        state_field = survey_with_logic.sections.get(order=1).fields.get()
+        response = Response.objects.create(
+            survey=survey_with_logic,
+            data={str(country_field.id): "usa", str(state_field.id): "ca"}
+        )
+        
+        validate_logic_async(str(response.id))
+        
+        response.refresh_from_db()
+        assert response.validation_status == "valid"
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSyncResponseFieldIndex:
+    """Test per-field expression indexes on response data."""
+    
+    def _index_definition(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = %s", [name])
+            row = cursor.fetchone()
+            return row and row[0]
+    
+    def test_create_and_drop_index(self, complete_survey):
+        field = complete_survey.sections.get(order=0).fields.get(order=0)
+        name = response_field_index_name(field.id)
+        
+        sync_response_field_index(str(field.id), True)
+        # Partial on the field's survey, so other surveys' rows never enter it
+        assert f"survey_id = '{complete_survey.id}'" in self._index_definition(name)
+        
+        sync_response_field_index(str(field.id), False)
+        assert self._index_definition(name) is None
+    
+    def test_cascade_delete_queues_drop(self, complete_survey, mocker):
+        field = complete_survey.sections.get(order=0).fields.get(order=0)
+        field.is_filterable = True
+        field.save()
+        delay = mocker.patch("apps.surveys.signals.sync_response_field_index.delay")
+        
+        complete_survey.delete()
+        
+        delay.assert_called_once_with(str(field.id), False)
@@ -1,26 +1,54 @@
 """Views for Response and PartialResponse API endpoints."""
+import json
 import uuid
 
-from django.db.models import Prefetch
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response as DRFResponse
 from rest_framework.views import APIView
 
-from apps.audit.middleware import log_audit_event
+from apps.audit.middleware import get_client_info, log_audit_event, skip_audit
 from apps.audit.models import AuditAction
-from apps.logic_engine import LogicEngine
-from apps.surveys.models import Section, Survey
+from apps.logic_engine import LogicEngine, count_conditions
+from apps.surveys.cache import get_active_survey_title, get_survey_structure, is_survey_active
 from apps.users.permissions import CanManageSurvey
 
-from .models import PartialResponse, Response
+from .cache import get_saved_partial, partial_save_digest, set_saved_partial
+from .models import (
+    CompletionStatus,
+    PartialResponse,
+    Response,
+    ValidationStatus,
+    session_token_uuid,
+)
 from .serializers import (
     PartialResponseSerializer,
+    ResponseListSerializer,
     ResponseSerializer,
     SubmissionSerializer,
 )
-from .tasks import export_responses_csv
+from .tasks import (
+    EXPORT_LINK_SALT,
+    delete_partial_response,
+    export_responses_csv,
+    export_storage,
+    stream_responses_csv,
+    validate_logic_async,
+)
+
+
+class ResponseCursorPagination(CursorPagination):
+    """Keyset pages (WHERE submitted_at < cursor) instead of OFFSET scans."""
+    
+    ordering = "-submitted_at"
 
 
 class ResponseViewSet(viewsets.ReadOnlyModelViewSet):
@@ -33,13 +61,30 @@ class ResponseViewSet(viewsets.ReadOnlyModelViewSet):
     """
     
     permission_classes = [CanManageSurvey]
-    serializer_class = ResponseSerializer
+    pagination_class = ResponseCursorPagination
+    
+    # Columns behind ResponseListSerializer; retrieve adds the answers
+    LIST_COLUMNS = (
+        "id", "survey", "user", "user__email", "submitted_at",
+        "completion_status", "completion_time_seconds", "validation_status"
+    )
     
     def get_queryset(self):
         survey_pk = self.kwargs.get("survey_pk")
-        return Response.objects.filter(
-            survey_id=survey_pk
-        ).select_related("survey", "user").order_by("-submitted_at")
+        queryset = Response.objects.filter(survey_id=survey_pk).select_related("user")
+        if self.action == "list":
+            # Pages never carry the multi-KB data payload
+            queryset = queryset.only(*self.LIST_COLUMNS)
+        else:
+            queryset = queryset.select_related("survey").only(
+                *self.LIST_COLUMNS, "survey__title", "data"
+            )
+        return queryset.order_by("-submitted_at")
+    
+    def get_serializer_class(self):
+        if self.action == "list":
+            return ResponseListSerializer
+        return ResponseSerializer
     
     @action(detail=False, methods=["post"])
     def export(self, request, survey_pk=None, **kwargs):
@@ -49,6 +94,72 @@ class ResponseViewSet(viewsets.ReadOnlyModelViewSet):
             {"message": "Export started. You will receive an email when ready."},
             status=status.HTTP_202_ACCEPTED
         )
+    
+    @action(detail=False, methods=["get"])
+    def download(self, request, survey_pk=None, **kwargs):
+        """Stream the CSV export directly, in constant memory, for small surveys."""
+        # Bounded count: stops scanning once the limit is exceeded
+        max_rows = settings.RESPONSE_DOWNLOAD_MAX_ROWS
+        if Response.objects.filter(survey_id=survey_pk)[:max_rows + 1].count() > max_rows:
+            return DRFResponse(
+                {
+                    "error": f"More than {max_rows} responses; use the export endpoint instead.",
+                    "export_url": request.build_absolute_uri("../export/"),
+                },
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        
+        log_audit_event(
+            action=AuditAction.EXPORT,
+            user=request.user,
+            description=f"CSV download of responses for survey {survey_pk}",
+            request=request,
+        )
+        response = StreamingHttpResponse(
+            stream_responses_csv(survey_pk), content_type="text/csv"
+        )
+        response["Content-Disposition"] = f'attachment; filename="responses-{survey_pk}.csv"'
+        return response
+
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"exports/(?P<token>[^/]+)",
+        url_name="export-file",
+    )
+    def export_file(self, request, token, survey_pk=None, **kwargs):
+        """Serve a finished async export to the user its emailed link was signed for."""
+        try:
+            export = signing.loads(
+                token, salt=EXPORT_LINK_SALT, max_age=settings.RESPONSE_EXPORT_LINK_MAX_AGE
+            )
+        except signing.BadSignature:
+            export = None
+        storage = export_storage()
+        if (
+            export is None
+            or export["survey"] != str(survey_pk)
+            or export["email"] != request.user.email
+            or not storage.exists(export["path"])
+        ):
+            return DRFResponse(
+                {"error": "Export link is invalid or has expired"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        log_audit_event(
+            action=AuditAction.EXPORT,
+            user=request.user,
+            description=f"CSV export download of responses for survey {survey_pk}",
+            request=request,
+        )
+        return FileResponse(
+            storage.open(export["path"], "rb"),
+            as_attachment=True,
+            filename=f"responses-{survey_pk}.csv",
+            content_type="text/csv",
+        )
 
 
 class PartialSaveView(APIView):
@@ -65,35 +176,39 @@ class PartialSaveView(APIView):
         """Save or update partial response."""
         # Get or generate session token
         session_token = request.data.get("session_token")
-        if not session_token:
-            session_token = str(uuid.uuid4())
+        if session_token:
+            session_token = session_token_uuid(session_token)
+        else:
+            session_token = uuid.uuid4()
         
-        # Get survey
-        try:
-            survey = Survey.objects.get(id=survey_id, is_active=True)
-        except Survey.DoesNotExist:
+        # The upsert only needs the survey id, so a cached check suffices
+        if not is_survey_active(survey_id):
             return DRFResponse(
                 {"error": "Survey not found or inactive"},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Update or create partial response
-        partial, created = PartialResponse.objects.update_or_create(
-            survey=survey,
-            session_token=session_token,
-            defaults={
-                "data": request.data.get("data", {}),
-                "last_section_id": request.data.get("last_section_id"),
-                "last_field_id": request.data.get("last_field_id"),
-                "user": request.user if request.user.is_authenticated else None,
-            }
-        )
+        values = {
+            "data": request.data.get("data", {}),
+            "last_section_id": request.data.get("last_section_id"),
+            "last_field_id": request.data.get("last_field_id"),
+            "user_id": request.user.pk if request.user.is_authenticated else None,
+        }
+        
+        # Idle heartbeats resend the same state; answer those from cache
+        digest = partial_save_digest(values)
+        payload = get_saved_partial(survey_id, session_token, digest)
+        created = False
+        if payload is None:
+            # Update or create partial response (single INSERT ... ON CONFLICT)
+            partial, created = PartialResponse.upsert(survey_id, session_token, **values)
+            payload = PartialResponseSerializer(partial).data
+            set_saved_partial(survey_id, session_token, digest, payload)
         
-        serializer = PartialResponseSerializer(partial)
         return DRFResponse(
             {
-                "session_token": session_token,
-                "partial_response": serializer.data
+                "session_token": str(session_token),
+                "partial_response": payload
             },
             status=status.HTTP_200_OK if not created else status.HTTP_201_CREATED
         )
@@ -111,7 +226,7 @@ class PartialSaveView(APIView):
         try:
             partial = PartialResponse.objects.get(
                 survey_id=survey_id,
-                session_token=session_token
+                session_token=session_token_uuid(session_token)
             )
         except PartialResponse.DoesNotExist:
             return DRFResponse(
@@ -119,8 +234,21 @@ class PartialSaveView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        # Polling clients revalidate; answer 304 before serializing the data
+        last_modified = partial.last_updated.timestamp()
+        etag = quote_etag(str(last_modified))
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified)
+        )
+        if not_modified is not None:
+            return not_modified
+        
         serializer = PartialResponseSerializer(partial)
-        return DRFResponse(serializer.data)
+        response = DRFResponse(serializer.data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class SubmitView(APIView):
@@ -135,24 +263,25 @@ class SubmitView(APIView):
     
     def post(self, request, survey_id, version=None):
         """Submit final survey response."""
-        # Get survey with all sections and fields
-        try:
-            survey = Survey.objects.prefetch_related(
-                Prefetch(
-                    "sections",
-                    queryset=Section.objects.prefetch_related("fields").order_by("order")
-                )
-            ).get(id=survey_id, is_active=True)
-        except Survey.DoesNotExist:
+        # Refuse unknown or closed surveys before touching the database; the
+        # title, sections and fields all come from cache, not a Survey query
+        survey_title = get_active_survey_title(survey_id)
+        if survey_title is None:
             return DRFResponse(
                 {"error": "Survey not found or inactive"},
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        structure = get_survey_structure(survey_id)
+        # Only heavy conditional logic is validated after commit
+        defer_logic = (
+            count_conditions(structure) > settings.LOGIC_DEFERRED_VALIDATION_THRESHOLD
+        )
+        
         # Validate submission
         serializer = SubmissionSerializer(
             data=request.data,
-            context={"survey": survey, "request": request}
+            context={"survey": structure, "request": request, "defer_logic": defer_logic}
         )
         
         if not serializer.is_valid():
@@ -160,32 +289,42 @@ class SubmitView(APIView):
         
         # Process sensitive fields - encrypt PII data
         submitted_data = serializer.validated_data["data"]
-        encrypted_data = self._extract_sensitive_data(survey, submitted_data)
+        encrypted_data = self._extract_sensitive_data(structure, submitted_data)
         
         # Create response
+        ip_address, user_agent = get_client_info(request)
         response = Response.objects.create(
-            survey=survey,
+            survey_id=survey_id,
             user=request.user if request.user.is_authenticated else None,
             data=submitted_data,
             encrypted_data=encrypted_data,
-            ip_address=self._get_client_ip(request),
-            user_agent=request.META.get("HTTP_USER_AGENT", "")[:500],
+            ip_address=ip_address,
+            user_agent=user_agent,
+            completion_status=serializer.validated_data.get(
+                "completion_status", CompletionStatus.COMPLETE
+            ),
+            completion_time_seconds=serializer.validated_data.get("completion_time_seconds"),
+            validation_status=(
+                ValidationStatus.PENDING if defer_logic else ValidationStatus.VALID
+            ),
         )
+        if defer_logic:
+            transaction.on_commit(lambda: validate_logic_async.delay(str(response.id)))
         
         # Clean up partial response if session token provided
         session_token = serializer.validated_data.get("session_token")
         if session_token:
-            PartialResponse.objects.filter(
-                survey=survey,
-                session_token=session_token
-            ).delete()
+            transaction.on_commit(
+                lambda: delete_partial_response.delay(str(survey_id), session_token)
+            )
         
-        # Audit log
+        # Audit log (replaces the generic middleware entry for this request)
+        skip_audit(request)
         log_audit_event(
             action=AuditAction.CREATE,
             user=request.user if request.user.is_authenticated else None,
             obj=response,
-            description=f"Survey response submitted for '{survey.title}'",
+            description=f"Survey response submitted for '{survey_title}'",
             request=request,
         )
         
@@ -194,22 +333,13 @@ class SubmitView(APIView):
             status=status.HTTP_201_CREATED
         )
     
-    def _extract_sensitive_data(self, survey, data):
+    def _extract_sensitive_data(self, structure, data):
         """Extract and return sensitive field values for encryption."""
-        sensitive_values = {}
-        
-        for section in survey.sections.all():
-            for field in section.fields.all():
-                if field.is_sensitive:
-                    field_id = str(field.id)
-                    if field_id in data:
-                        sensitive_values[field_id] = data[field_id]
-        
-        return str(sensitive_values) if sensitive_values else ""
-    
-    def _get_client_ip(self, request):
-        """Extract client IP from request."""
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            return x_forwarded_for.split(",")[0].strip()
-        return request.META.get("REMOTE_ADDR")
+        # FieldSpec ids are already strings, the keys submissions use
+        sensitive_values = {
+            field.id: data[field.id]
+            for section in structure
+            for field in section.fields
+            if field.is_sensitive and field.id in data
+        }
+        return json.dumps(sensitive_values, separators=(",", ":")) if sensitive_values else ""
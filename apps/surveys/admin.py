@@ -3,6 +3,20 @@ from django.contrib import admin
 from .models import Field, Section, Survey
 
 
+class ChangelistOnlyMixin:
+    """Loads only changelist_only_fields on the changelist page."""
+    
+    changelist_only_fields = ()
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith("_changelist"):
+            # Keeps the JSONB options/logic_rules payloads off every row
+            queryset = queryset.only(*self.changelist_only_fields)
+        return queryset
+
+
 class SectionInline(admin.TabularInline):
     model = Section
     extra = 0
@@ -25,15 +39,25 @@ class SurveyAdmin(admin.ModelAdmin):
 
 
 @admin.register(Section)
-class SectionAdmin(admin.ModelAdmin):
+class SectionAdmin(ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ("title", "survey", "order")
+    list_select_related = ("survey",)
+    changelist_only_fields = ("title", "order", "survey__title", "survey__version")
+    show_full_result_count = False
     list_filter = ("survey",)
     search_fields = ("title",)
     inlines = [FieldInline]
 
 
 @admin.register(Field)
-class FieldAdmin(admin.ModelAdmin):
+class FieldAdmin(ChangelistOnlyMixin, admin.ModelAdmin):
     list_display = ("label", "section", "field_type", "is_required", "is_sensitive", "order")
+    # Section.__str__ reads its survey's title
+    list_select_related = ("section__survey",)
+    changelist_only_fields = (
+        "label", "field_type", "is_required", "is_sensitive", "order",
+        "section__title", "section__survey__title",
+    )
+    show_full_result_count = False
     list_filter = ("field_type", "is_required", "is_sensitive")
     search_fields = ("label",)
@@ -6,3 +6,6 @@ class SurveysConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.surveys"
     verbose_name = "Surveys"
+    
+    def ready(self):
+        from . import signals  # noqa: F401
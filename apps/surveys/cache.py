@@ -2,10 +2,50 @@
 Redis-based caching utilities for survey templates.
 Maps to FR 3.2: Caching Strategy.
 """
+from typing import Any, NamedTuple
+
 from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from apps.logic_engine import build_option_index, rules_key
 
 SURVEY_CACHE_PREFIX = "survey_template"
 SURVEY_CACHE_TIMEOUT = 60 * 60  # 1 hour
+# Versioned: bump when FieldSpec/SectionSpec change shape, so entries
+# pickled by the previous release are not unpickled into the new tuples
+SURVEY_STRUCTURE_PREFIX = "survey_structure:v3"
+# Holds the title of an active survey, or False; v2 replaced the boolean flag
+SURVEY_ACTIVE_PREFIX = "survey_active:v2"
+SURVEY_ACTIVE_TIMEOUT = 60 * 5  # 5 minutes
+# Redis SET of survey ids with cached entries, so invalidate_all_survey_caches
+# can delete them without a KEYS/SCAN over the whole keyspace
+SURVEY_INDEX_KEY = f"{SURVEY_CACHE_PREFIX}:index"
+
+
+class FieldSpec(NamedTuple):
+    """The parts of a Field that submission validation reads."""
+    
+    id: str
+    label: str
+    field_type: str
+    is_required: bool
+    min_value: Any
+    max_value: Any
+    is_sensitive: bool
+    logic_rules: dict
+    rules_key: str | None
+    # build_option_index() of the options, for fields with dependency_config
+    option_index: Any
+
+
+class SectionSpec(NamedTuple):
+    """A section's visibility rules and its ordered fields."""
+    
+    id: str
+    logic_rules: dict
+    rules_key: str | None
+    fields: tuple
 
 
 def get_survey_cache_key(survey_id: str) -> str:
@@ -24,13 +64,136 @@ def get_cached_survey(survey_id: str):
 def set_cached_survey(survey_id: str, survey_data: dict, timeout: int = SURVEY_CACHE_TIMEOUT):
     """Cache survey template data."""
     cache.set(get_survey_cache_key(survey_id), survey_data, timeout)
+    _track_survey(survey_id)
+
+
+def _track_survey(survey_id: str):
+    """Record a survey id in the index of cached surveys."""
+    get_redis_connection("default").sadd(cache.make_key(SURVEY_INDEX_KEY), str(survey_id))
+
+
+def get_survey_structure_cache_key(survey_id: str) -> str:
+    """Generate cache key for a survey's section/field structure."""
+    return f"{SURVEY_STRUCTURE_PREFIX}:{survey_id}"
+
+
+def build_survey_structure(survey_id: str) -> tuple:
+    """
+    Load a survey's sections and fields in one query as plain tuples.
+    Sections without fields are omitted; they cannot affect a submission.
+    """
+    from .models import Field
+    
+    rows = Field.objects.filter(section__survey_id=survey_id).order_by(
+        "section__order", "order"
+    ).values_list(
+        "section_id", "section__logic_rules", "id", "label", "field_type",
+        "is_required", "min_value", "max_value", "is_sensitive", "logic_rules",
+        "options", "dependency_config",
+    )
+    
+    sections = {}
+    for section_id, section_rules, field_id, *field_values, field_rules, options, dependency in rows:
+        if section_id not in sections:
+            sections[section_id] = (str(section_id), section_rules, [])
+        filter_key = dependency.get("filter_by")
+        option_index = build_option_index(options, filter_key) if filter_key and options else None
+        sections[section_id][2].append(
+            FieldSpec(
+                str(field_id), *field_values, field_rules, rules_key(field_rules), option_index
+            )
+        )
+    
+    return tuple(
+        SectionSpec(section_id, rules, rules_key(rules), tuple(fields))
+        for section_id, rules, fields in sections.values()
+    )
+
+
+def get_survey_structure(survey_id: str) -> tuple:
+    """
+    Return the cached structure for a survey, building it on a miss.
+    Accepted by LogicEngine wherever a Survey instance is.
+    """
+    key = get_survey_structure_cache_key(survey_id)
+    structure = cache.get(key)
+    if structure is None:
+        structure = build_survey_structure(survey_id)
+        cache.set(key, structure, SURVEY_CACHE_TIMEOUT)
+        _track_survey(survey_id)
+    return structure
+
+
+def get_survey_active_cache_key(survey_id: str) -> str:
+    """Generate cache key for a survey's accepting-submissions flag."""
+    return f"{SURVEY_ACTIVE_PREFIX}:{survey_id}"
+
+
+def get_active_survey_title(survey_id: str) -> str | None:
+    """
+    Title of an active survey, or None if it is unknown or closed. Cached
+    either way so repeated requests for unknown or closed surveys are
+    refused without a query.
+    Only active surveys are tracked for invalidate_all_survey_caches;
+    negative entries for arbitrary ids just expire.
+    """
+    from .models import Survey
+    
+    key = get_survey_active_cache_key(survey_id)
+    title = cache.get(key)
+    if title is None:
+        title = Survey.objects.filter(id=survey_id, is_active=True).values_list(
+            "title", flat=True
+        ).first()
+        if title is None:
+            title = False
+        else:
+            _track_survey(survey_id)
+        cache.set(key, title, SURVEY_ACTIVE_TIMEOUT)
+    return None if title is False else title
+
+
+def is_survey_active(survey_id: str) -> bool:
+    """Whether a survey exists and is active (see get_active_survey_title)."""
+    return get_active_survey_title(survey_id) is not None
 
 
 def invalidate_survey_cache(survey_id: str):
-    """Remove survey from cache (call on update/delete)."""
-    cache.delete(get_survey_cache_key(survey_id))
+    """Remove survey template, structure and active flag from cache (call on update/delete)."""
+    cache.delete_many([
+        get_survey_cache_key(survey_id),
+        get_survey_structure_cache_key(survey_id),
+        get_survey_active_cache_key(survey_id),
+    ])
+
+
+def invalidate_survey_cache_on_commit(survey_id: str):
+    """
+    Invalidate once the current transaction commits, so a concurrent read
+    cannot re-cache the pre-commit rows after the delete.
+    """
+    transaction.on_commit(lambda: invalidate_survey_cache(survey_id))
 
 
 def invalidate_all_survey_caches():
-    """Clear all survey caches (admin operation)."""
-    cache.delete_pattern(f"{SURVEY_CACHE_PREFIX}:*")
+    """
+    Clear all survey caches (admin operation).
+    Reads and drops the index atomically; ids of surveys already
+    invalidated individually just delete keys that are gone.
+    """
+    index_key = cache.make_key(SURVEY_INDEX_KEY)
+    pipe = get_redis_connection("default").pipeline()
+    pipe.smembers(index_key)
+    pipe.delete(index_key)
+    survey_ids, _ = pipe.execute()
+    
+    keys = []
+    for survey_id in survey_ids:
+        survey_id = survey_id.decode()
+        keys += [
+            get_survey_cache_key(survey_id),
+            get_survey_structure_cache_key(survey_id),
+            get_survey_active_cache_key(survey_id),
+        ]
+    if keys:
+        cache.delete_many(keys)
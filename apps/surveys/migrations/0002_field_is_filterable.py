@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-16 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="field",
+            name="is_filterable",
+            field=models.BooleanField(default=False),
+        ),
+    ]
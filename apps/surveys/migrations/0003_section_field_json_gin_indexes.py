@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-16 09:12
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("surveys", "0002_field_is_filterable"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="section",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["logic_rules"],
+                name="idx_sections_logic_rules_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="field",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["options"], name="idx_fields_options_gin", opclasses=["jsonb_path_ops"]
+            ),
+        ),
+    ]
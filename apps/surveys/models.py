@@ -4,6 +4,7 @@ Survey, Section, and Field models for ADSP.
 import uuid
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 
@@ -69,6 +70,12 @@ class Section(models.Model):
         ordering = ["survey", "order"]
         indexes = [
             models.Index(fields=["survey", "order"]),
+            # Containment (@>) lookups, e.g. rules conditioned on a field
+            GinIndex(
+                fields=["logic_rules"],
+                opclasses=["jsonb_path_ops"],
+                name="idx_sections_logic_rules_gin"
+            ),
         ]
     
     def __str__(self):
@@ -133,6 +140,10 @@ class Field(models.Model):
     # Security - marks field as containing PII
     is_sensitive = models.BooleanField(default=False)
     
+    # Hot filter target - gets a BTREE expression index on
+    # responses (data->>'<field id>'), see sync_response_field_index
+    is_filterable = models.BooleanField(default=False)
+    
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -143,6 +154,12 @@ class Field(models.Model):
         indexes = [
             models.Index(fields=["section", "order"]),
             models.Index(fields=["field_type"]),
+            # Containment (@>) lookups, e.g. fields offering a given option
+            GinIndex(
+                fields=["options"],
+                opclasses=["jsonb_path_ops"],
+                name="idx_fields_options_gin"
+            ),
         ]
     
     def __str__(self):
@@ -1,8 +1,39 @@
 """Serializers for Survey, Section, and Field."""
+from collections import defaultdict
+
+from django.db import transaction
 from rest_framework import serializers
 
+from apps.responses.tasks import sync_response_field_index
+
+from .cache import invalidate_survey_cache_on_commit
 from .models import Field, Section, Survey
 
+SECTION_BATCH_SIZE = 500
+FIELD_BATCH_SIZE = 1000
+
+
+def _build_fields(section, fields_data):
+    """Unsaved Field instances for a section, ordered by position unless given."""
+    # An "order" in the data overrides the enumerated default
+    return [
+        Field(section=section, **{"order": field_order, **field_data})
+        for field_order, field_data in enumerate(fields_data)
+    ]
+
+
+def index_filterable_fields(fields):
+    """
+    Build the response index of each filterable field once the insert is
+    committed; bulk_create bypasses FieldViewSet, which does this per field.
+    """
+    for field in fields:
+        if field.is_filterable:
+            field_id = str(field.id)
+            transaction.on_commit(
+                lambda field_id=field_id: sync_response_field_index.delay(field_id, True)
+            )
+
 
 class FieldSerializer(serializers.ModelSerializer):
     """Serializer for survey fields."""
@@ -13,9 +44,13 @@ class FieldSerializer(serializers.ModelSerializer):
             "id", "field_type", "label", "placeholder", "help_text",
             "options", "is_required", "validation_regex", "validation_message",
             "min_value", "max_value", "logic_rules", "dependency_config",
-            "is_sensitive", "order"
+            "is_sensitive", "is_filterable", "order"
         ]
         read_only_fields = ["id"]
+    
+    def to_representation(self, instance):
+        """Copy the model attributes straight into the payload; all are plain values."""
+        return {"id": str(instance.id), **{name: getattr(instance, name) for name in _FIELD_VALUES}}
 
 
 class SectionSerializer(serializers.ModelSerializer):
@@ -29,11 +64,59 @@ class SectionSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
+_DATETIME_FIELD = serializers.DateTimeField()
+# FieldSerializer's model fields other than id, copied through unchanged
+_FIELD_VALUES = [name for name in FieldSerializer.Meta.fields if name != "id"]
+
+
+# Keys a nested section/field payload may carry; create() splats them into models
+_SECTION_KEYS = frozenset(["title", "description", "order", "logic_rules", "fields"])
+_FIELD_KEYS = frozenset(_FIELD_VALUES)
+
+
+def _unknown_key_errors(items, allowed, path):
+    """One message per item of a nested payload that is not an object of allowed keys."""
+    if not isinstance(items, list):
+        return [f"{path}: expected a list."]
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(f"{path}[{index}]: expected an object.")
+        elif unknown := item.keys() - allowed:
+            errors.append(f"{path}[{index}]: unknown keys {', '.join(sorted(unknown))}.")
+    return errors
+
+
+def survey_detail_sections(survey_id):
+    """
+    The "sections" of a survey detail payload, from one .values() query per
+    table correlated in Python; no Section or Field instances are built.
+    """
+    sections = list(
+        Section.objects.filter(survey_id=survey_id).order_by("order").values(
+            "id", "title", "description", "order", "logic_rules"
+        )
+    )
+    fields_by_section = defaultdict(list)
+    for field in Field.objects.filter(section__survey_id=survey_id).order_by("order").values(
+        "id", *_FIELD_VALUES, "section_id"
+    ):
+        section_id = field.pop("section_id")
+        field["id"] = str(field["id"])
+        fields_by_section[section_id].append(field)
+    
+    for section in sections:
+        section["fields"] = fields_by_section[section["id"]]
+        section["id"] = str(section["id"])
+    return sections
+
+
 class SurveyListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for survey lists."""
     
     owner_email = serializers.EmailField(source="owner.email", read_only=True)
-    section_count = serializers.IntegerField(source="sections.count", read_only=True)
+    # Annotated by SurveyViewSet.get_queryset (Count("sections"))
+    section_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Survey
@@ -42,6 +125,20 @@ class SurveyListSerializer(serializers.ModelSerializer):
             "is_active", "version", "section_count", "created_at", "updated_at"
         ]
         read_only_fields = ["id", "owner_email", "section_count", "created_at", "updated_at"]
+    
+    def to_representation(self, instance):
+        """Read-only list rows, built directly rather than field by field."""
+        return {
+            "id": str(instance.id),
+            "title": instance.title,
+            "description": instance.description,
+            "owner_email": instance.owner.email,
+            "is_active": instance.is_active,
+            "version": instance.version,
+            "section_count": instance.section_count,
+            "created_at": _DATETIME_FIELD.to_representation(instance.created_at),
+            "updated_at": _DATETIME_FIELD.to_representation(instance.updated_at),
+        }
 
 
 class SurveyDetailSerializer(serializers.ModelSerializer):
@@ -57,6 +154,25 @@ class SurveyDetailSerializer(serializers.ModelSerializer):
             "is_active", "version", "sections", "created_at", "updated_at"
         ]
         read_only_fields = ["id", "owner", "owner_email", "version", "created_at", "updated_at"]
+    
+    def to_representation(self, instance):
+        """
+        Build the payload as plain dicts (see survey_detail_sections);
+        nesting SectionSerializer/FieldSerializer runs DRF's per-field
+        machinery for every row. The output is identical.
+        """
+        return {
+            "id": str(instance.id),
+            "title": instance.title,
+            "description": instance.description,
+            "owner": instance.owner_id,
+            "owner_email": instance.owner.email,
+            "is_active": instance.is_active,
+            "version": instance.version,
+            "sections": survey_detail_sections(instance.id),
+            "created_at": _DATETIME_FIELD.to_representation(instance.created_at),
+            "updated_at": _DATETIME_FIELD.to_representation(instance.updated_at),
+        }
 
 
 class SurveyCreateSerializer(serializers.ModelSerializer):
@@ -69,33 +185,40 @@ class SurveyCreateSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "description", "is_active", "sections"]
         read_only_fields = ["id"]
     
+    def validate_sections(self, value):
+        """Reject unknown section/field keys up front, all of them at once."""
+        errors = _unknown_key_errors(value, _SECTION_KEYS, "sections")
+        for index, section in enumerate(value if isinstance(value, list) else []):
+            if isinstance(section, dict):
+                errors += _unknown_key_errors(
+                    section.get("fields", []), _FIELD_KEYS, f"sections[{index}].fields"
+                )
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
+    
     def create(self, validated_data):
         sections_data = validated_data.pop("sections", [])
         validated_data["owner"] = self.context["request"].user
         
-        survey = Survey.objects.create(**validated_data)
-        
-        # Create sections and fields
-        for section_order, section_data in enumerate(sections_data):
-            fields_data = section_data.pop("fields", [])
-            # Use order from data if provided, otherwise use enumeration
-            if "order" not in section_data:
-                section_data["order"] = section_order
+        with transaction.atomic():
+            survey = Survey.objects.create(**validated_data)
             
-            section = Section.objects.create(
-                survey=survey,
-                **section_data
-            )
+            # Build everything in memory, then insert sections and fields in
+            # one statement each; UUID primary keys are assigned client-side
+            sections, fields = [], []
+            for section_order, section_data in enumerate(sections_data):
+                # Copied, not popped: the nested dicts are shared with
+                # serializer.validated_data. An "order" in the data
+                # overrides the enumerated default
+                section_values = {key: value for key, value in section_data.items() if key != "fields"}
+                section = Section(survey=survey, **{"order": section_order, **section_values})
+                sections.append(section)
+                fields += _build_fields(section, section_data.get("fields", []))
             
-            for field_order, field_data in enumerate(fields_data):
-                # Use order from data if provided, otherwise use enumeration
-                if "order" not in field_data:
-                    field_data["order"] = field_order
-                
-                Field.objects.create(
-                    section=section,
-                    **field_data
-                )
+            Section.objects.bulk_create(sections, batch_size=SECTION_BATCH_SIZE)
+            Field.objects.bulk_create(fields, batch_size=FIELD_BATCH_SIZE)
+            index_filterable_fields(fields)
         
         return survey
 
@@ -110,19 +233,24 @@ class SectionCreateSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "description", "order", "logic_rules", "fields"]
         read_only_fields = ["id"]
     
+    def validate_fields(self, value):
+        """Reject unknown field keys up front, all of them at once."""
+        errors = _unknown_key_errors(value, _FIELD_KEYS, "fields")
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
+    
     def create(self, validated_data):
         fields_data = validated_data.pop("fields", [])
-        section = Section.objects.create(**validated_data)
-        
-        for field_order, field_data in enumerate(fields_data):
-            # Use order from data if provided, otherwise use enumeration
-            if "order" not in field_data:
-                field_data["order"] = field_order
-            
-            Field.objects.create(
-                section=section,
-                **field_data
+        with transaction.atomic():
+            section = Section.objects.create(**validated_data)
+            fields = Field.objects.bulk_create(
+                _build_fields(section, fields_data), batch_size=FIELD_BATCH_SIZE
             )
+            index_filterable_fields(fields)
+        
+        # bulk_create sends no post_save, so the signal fired before the fields existed
+        if fields_data:
+            invalidate_survey_cache_on_commit(section.survey_id)
         
         return section
-
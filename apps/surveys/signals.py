@@ -0,0 +1,51 @@
+"""
+Cache invalidation for survey templates.
+Any write to a survey, section or field - API, admin or shell - drops
+the cached template and structure, so submissions never validate
+against a stale layout. The drop happens when the write commits.
+Deleting a filterable field, directly or by cascade, also drops its
+expression index on responses.
+"""
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.responses.tasks import sync_response_field_index
+
+from .cache import invalidate_survey_cache_on_commit
+from .models import Field, Section, Survey
+
+
+@receiver([post_save, post_delete], sender=Survey, dispatch_uid="survey_cache_survey")
+def invalidate_on_survey_change(sender, instance, **kwargs):
+    invalidate_survey_cache_on_commit(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Section, dispatch_uid="survey_cache_section")
+def invalidate_on_section_change(sender, instance, **kwargs):
+    invalidate_survey_cache_on_commit(instance.survey_id)
+
+
+@receiver([post_save, post_delete], sender=Field, dispatch_uid="survey_cache_field")
+def invalidate_on_field_change(sender, instance, origin=None, **kwargs):
+    # Cascaded from a survey or section delete, whose receiver already invalidated
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model in (Survey, Section):
+        return
+    
+    if Field.section.is_cached(instance):
+        survey_id = instance.section.survey_id
+    else:
+        survey_id = Section.objects.filter(pk=instance.section_id).values_list(
+            "survey_id", flat=True
+        ).first()
+    if survey_id is not None:
+        invalidate_survey_cache_on_commit(survey_id)
+
+
+@receiver(post_delete, sender=Field, dispatch_uid="response_field_index_drop")
+def drop_response_index_on_field_delete(sender, instance, **kwargs):
+    if instance.is_filterable:
+        field_id = str(instance.pk)
+        transaction.on_commit(lambda: sync_response_field_index.delay(field_id, False))
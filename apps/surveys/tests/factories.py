@@ -1,6 +1,13 @@
-"""Factory Boy factories for creating test data."""
+"""
+Factory Boy factories for creating test data.
+Filler values are sequences rather than Faker: nothing asserts on their realism.
+"""
+import functools
+import uuid
+
 import factory
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import Group
 from factory.django import DjangoModelFactory
 
@@ -10,6 +17,23 @@ from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_V
 
 User = get_user_model()
 
+TEST_PASSWORD = "testpass123"
+
+
+@functools.cache
+def hashed_test_password():
+    """Hash TEST_PASSWORD once, lazily, so the test settings' hasher is used."""
+    return make_password(TEST_PASSWORD)
+
+
+@functools.cache
+def get_group(name):
+    """
+    Group by name, fetched once per test. Rows created inside a test roll
+    back with it, so conftest clears this cache after every test.
+    """
+    return Group.objects.get_or_create(name=name)[0]
+
 
 class UserFactory(DjangoModelFactory):
     """Factory for creating User instances."""
@@ -19,7 +43,7 @@ class UserFactory(DjangoModelFactory):
     
     username = factory.Sequence(lambda n: f"user{n}")
     email = factory.Sequence(lambda n: f"user{n}@example.com")
-    password = factory.PostGenerationMethodCall("set_password", "testpass123")
+    password = factory.LazyFunction(hashed_test_password)
     is_active = True
     
     @factory.post_generation
@@ -33,8 +57,7 @@ class UserFactory(DjangoModelFactory):
                 self.groups.add(group)
         else:
             # Default to viewer group
-            group, _ = Group.objects.get_or_create(name=SURVEY_VIEWER_GROUP)
-            self.groups.add(group)
+            self.groups.add(get_group(SURVEY_VIEWER_GROUP))
 
 
 class AdminUserFactory(UserFactory):
@@ -49,8 +72,7 @@ class AdminUserFactory(UserFactory):
         if not create:
             return
         
-        group, _ = Group.objects.get_or_create(name=SURVEY_ADMIN_GROUP)
-        self.groups.add(group)
+        self.groups.add(get_group(SURVEY_ADMIN_GROUP))
 
 
 class AnalystUserFactory(UserFactory):
@@ -65,8 +87,7 @@ class AnalystUserFactory(UserFactory):
         if not create:
             return
         
-        group, _ = Group.objects.get_or_create(name=SURVEY_ANALYST_GROUP)
-        self.groups.add(group)
+        self.groups.add(get_group(SURVEY_ANALYST_GROUP))
 
 
 class SurveyFactory(DjangoModelFactory):
@@ -76,7 +97,7 @@ class SurveyFactory(DjangoModelFactory):
         model = Survey
     
     title = factory.Sequence(lambda n: f"Survey {n}")
-    description = factory.Faker("text", max_nb_chars=200)
+    description = factory.Sequence(lambda n: f"Survey description {n}")
     owner = factory.SubFactory(AdminUserFactory)
     is_active = True
     version = 1
@@ -90,7 +111,7 @@ class SectionFactory(DjangoModelFactory):
     
     survey = factory.SubFactory(SurveyFactory)
     title = factory.Sequence(lambda n: f"Section {n}")
-    description = factory.Faker("text", max_nb_chars=100)
+    description = factory.Sequence(lambda n: f"Section description {n}")
     order = factory.Sequence(lambda n: n)
     logic_rules = {}
 
@@ -104,7 +125,7 @@ class FieldFactory(DjangoModelFactory):
     section = factory.SubFactory(SectionFactory)
     field_type = FieldType.TEXT
     label = factory.Sequence(lambda n: f"Field {n}")
-    placeholder = factory.Faker("sentence", nb_words=3)
+    placeholder = factory.Sequence(lambda n: f"Placeholder {n}")
     help_text = ""
     options = []
     is_required = False
@@ -160,9 +181,9 @@ class ResponseFactory(DjangoModelFactory):
     user = factory.SubFactory(UserFactory)
     data = {}
     encrypted_data = ""
-    ip_address = factory.Faker("ipv4")
-    user_agent = factory.Faker("user_agent")
-    completion_time_seconds = factory.Faker("random_int", min=30, max=600)
+    ip_address = factory.Sequence(lambda n: f"10.0.{n >> 8 & 0xff}.{n & 0xff}")
+    user_agent = "pytest-UA"
+    completion_time_seconds = factory.Sequence(lambda n: 30 + n % 571)
 
 
 class AnonymousResponseFactory(ResponseFactory):
@@ -178,13 +199,28 @@ class PartialResponseFactory(DjangoModelFactory):
         model = PartialResponse
     
     survey = factory.SubFactory(SurveyFactory)
-    session_token = factory.Faker("uuid4")
+    session_token = factory.LazyFunction(uuid.uuid4)
     user = None
     data = {}
     last_section_id = None
     last_field_id = None
 
 
+# Factory and overrides for the j-th field of a complete survey's section
+COMPLETE_SECTION_FIELDS = (
+    (TextFieldFactory, {"is_required": True}),
+    (EmailFieldFactory, {"is_required": False}),
+    (SelectFieldFactory, {"is_required": True}),
+    (NumberFieldFactory, {"is_required": False}),
+    (FieldFactory, {"field_type": FieldType.TEXTAREA, "is_required": False}),
+)
+
+
+def _complete_section_fields(section_index):
+    """Field layout for a section: 3, 4, then 5 fields."""
+    return COMPLETE_SECTION_FIELDS[:min(3 + section_index, len(COMPLETE_SECTION_FIELDS))]
+
+
 class CompleteSurveyFactory(SurveyFactory):
     """Factory for creating a complete survey with sections and fields."""
     
@@ -201,21 +237,22 @@ class CompleteSurveyFactory(SurveyFactory):
             section = SectionFactory(survey=self, order=i)
             
             # Create 3-5 fields per section
-            num_fields = 3 if i == 0 else 4 if i == 1 else 5
-            
-            for j in range(num_fields):
-                if j == 0:
-                    TextFieldFactory(section=section, order=j, is_required=True)
-                elif j == 1:
-                    EmailFieldFactory(section=section, order=j, is_required=False)
-                elif j == 2:
-                    SelectFieldFactory(section=section, order=j, is_required=True)
-                elif j == 3:
-                    NumberFieldFactory(section=section, order=j, is_required=False)
-                else:
-                    FieldFactory(
-                        section=section,
-                        field_type=FieldType.TEXTAREA,
-                        order=j,
-                        is_required=False
-                    )
+            for j, (field_factory, overrides) in enumerate(_complete_section_fields(i)):
+                field_factory(section=section, order=j, **overrides)
+    
+    @classmethod
+    def create_bulk(cls, num_sections=3, **kwargs):
+        """
+        Create the same survey with one INSERT for all sections and one for
+        all fields. bulk_create sends no post_save signals; use the factory
+        itself for tests that depend on them.
+        """
+        survey = SurveyFactory(**kwargs)
+        sections = [SectionFactory.build(survey=survey, order=i) for i in range(num_sections)]
+        Section.objects.bulk_create(sections)
+        Field.objects.bulk_create([
+            field_factory.build(section=section, order=j, **overrides)
+            for i, section in enumerate(sections)
+            for j, (field_factory, overrides) in enumerate(_complete_section_fields(i))
+        ])
+        return survey
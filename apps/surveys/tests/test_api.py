@@ -2,9 +2,8 @@
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.test import APIClient
-from conftest import create_user_with_group
-from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
+from conftest import create_user_with_group, make_surveys
+from apps.users.models import SURVEY_ADMIN_GROUP
 
 from apps.surveys.models import Field, FieldType, Section, Survey
 
@@ -15,53 +14,38 @@ User = get_user_model()
 class TestSurveyAPI:
     """Test Survey API endpoints."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
-    @pytest.fixture
-    def analyst_user(self):
-        """Create analyst user."""
-        return create_user_with_group(
-            username="analyst",
-            email="analyst@example.com",
-            password="analystpass123",
-            group_name=SURVEY_ANALYST_GROUP
-        )
-    
-    @pytest.fixture
-    def viewer_user(self):
-        """Create viewer user."""
-        return create_user_with_group(
-            username="viewer",
-            email="viewer@example.com",
-            password="viewerpass123",
-            group_name=SURVEY_VIEWER_GROUP
-        )
-    
     def test_list_surveys_authenticated(self, api_client, admin_user):
         """Test listing surveys as authenticated user."""
         api_client.force_authenticate(user=admin_user)
         
-        Survey.objects.create(title="Survey 1", owner=admin_user)
-        Survey.objects.create(title="Survey 2", owner=admin_user)
+        make_surveys(2, admin_user)
         
         response = api_client.get("/api/v1/surveys/")
         
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 2
     
+    def test_list_counts_sections_in_list_query(self, api_client, admin_user):
+        """Test section_count does not cost a query per survey."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        api_client.force_authenticate(user=admin_user)
+        for i in range(3):
+            survey = Survey.objects.create(title=f"Survey {i}", owner=admin_user)
+            Section.objects.bulk_create(
+                [Section(survey=survey, title=f"Section {n}", order=n) for n in range(i)]
+            )
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get("/api/v1/surveys/")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(s["section_count"] for s in response.data["results"]) == [0, 1, 2]
+        assert {s["owner_email"] for s in response.data["results"]} == {admin_user.email}
+        assert not [q["sql"] for q in queries.captured_queries if 'FROM "sections"' in q["sql"]]
+        assert not [q["sql"] for q in queries.captured_queries if '"password"' in q["sql"]]
+    
     def test_list_surveys_unauthenticated(self, api_client):
         """Test listing surveys without authentication fails."""
         response = api_client.get("/api/v1/surveys/")
@@ -190,6 +174,42 @@ class TestSurveyAPI:
         assert new_survey.sections.count() == 1
         assert new_survey.sections.first().fields.count() == 1
     
+    def test_duplicate_copies_tree_in_bulk(self, api_client, admin_user, complete_survey):
+        """Test duplication inserts the sections and fields with one statement each."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        api_client.force_authenticate(user=admin_user)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(f"/api/v1/surveys/{complete_survey.id}/duplicate/")
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        assert [sql.split('"')[1] for sql in inserts if "audit" not in sql] == [
+            "surveys", "sections", "fields"
+        ]
+        assert [
+            [f["label"] for f in section["fields"]] for section in response.data["sections"]
+        ] == [
+            list(section.fields.values_list("label", flat=True))
+            for section in complete_survey.sections.order_by("order")
+        ]
+    
+    def test_duplicate_indexes_filterable_fields(
+        self, api_client, admin_user, complete_survey, mocker, django_capture_on_commit_callbacks
+    ):
+        """Test duplicated filterable fields keep the flag and get their own index."""
+        complete_survey.sections.get(order=0).fields.filter(order=0).update(is_filterable=True)
+        delay = mocker.patch("apps.surveys.serializers.sync_response_field_index.delay")
+        api_client.force_authenticate(user=admin_user)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(f"/api/v1/surveys/{complete_survey.id}/duplicate/")
+        
+        copy = Field.objects.get(section__survey_id=response.data["id"], is_filterable=True)
+        delay.assert_called_once_with(str(copy.id), True)
+    
     def test_cannot_update_other_users_survey(self, api_client, admin_user):
         """Test users cannot update surveys they don't own."""
         other_user = create_user_with_group(
@@ -212,21 +232,6 @@ class TestSurveyAPI:
 class TestSectionAPI:
     """Test Section API endpoints."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
     @pytest.fixture
     def survey(self, admin_user):
         """Create a test survey."""
@@ -263,8 +268,9 @@ class TestSectionAPI:
         """Test listing sections for a survey."""
         api_client.force_authenticate(user=admin_user)
         
-        Section.objects.create(survey=survey, title="Section 1", order=0)
-        Section.objects.create(survey=survey, title="Section 2", order=1)
+        Section.objects.bulk_create([
+            Section(survey=survey, title=f"Section {i + 1}", order=i) for i in range(2)
+        ])
         
         response = api_client.get(f"/api/v1/surveys/{survey.id}/sections/")
         
@@ -303,11 +309,6 @@ class TestSectionAPI:
 class TestPublicSurveyAPI:
     """Test public survey endpoint."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
     def test_get_active_survey_public(self, api_client):
         """Test retrieving an active survey without authentication."""
         user = create_user_with_group(
@@ -330,6 +331,24 @@ class TestPublicSurveyAPI:
         assert response.data["title"] == "Public Survey"
         assert len(response.data["sections"]) == 1
     
+    def test_warm_public_survey_skips_database(
+        self, api_client, complete_survey, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        """Test a cached public survey is served without queries until it changes."""
+        first = api_client.get(f"/api/v1/public/surveys/{complete_survey.id}/")
+        
+        with django_assert_num_queries(0):
+            second = api_client.get(f"/api/v1/public/surveys/{complete_survey.id}/")
+        
+        assert second.data == first.data
+        
+        complete_survey.is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            complete_survey.save()
+        response = api_client.get(f"/api/v1/public/surveys/{complete_survey.id}/")
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
     def test_get_inactive_survey_public_fails(self, api_client):
         """Test retrieving an inactive survey fails."""
         user = create_user_with_group(
@@ -1,9 +1,14 @@
-"""Unit tests for Survey, Section, and Field models."""
+"""
+Unit tests for Survey, Section, and Field models.
+test_section_logic_rules_storage is the one JSONB round-trip test; the
+other JSON field tests assert on the saved instance without reloading it.
+"""
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
-from conftest import create_user_with_group
-from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
+from django.utils import timezone
 
 from apps.surveys.models import Field, FieldType, Section, Survey
 
@@ -14,26 +19,19 @@ User = get_user_model()
 class TestSurveyModel:
     """Test Survey model functionality."""
     
-    def test_create_survey(self):
+    def test_create_survey(self, shared_admin_user):
         """Test creating a basic survey."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        
         survey = Survey.objects.create(
             title="Test Survey",
             description="Test Description",
-            owner=user,
+            owner=shared_admin_user,
             is_active=True
         )
         
         assert survey.id is not None
         assert survey.title == "Test Survey"
         assert survey.version == 1
-        assert survey.owner == user
+        assert survey.owner == shared_admin_user
         assert str(survey) == "Test Survey (v1)"
     
     def test_survey_requires_owner(self):
@@ -44,36 +42,28 @@ class TestSurveyModel:
                 description="Test Description"
             )
     
-    def test_survey_default_values(self):
+    def test_survey_default_values(self, shared_admin_user):
         """Test survey default values."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        
         survey = Survey.objects.create(
             title="Test Survey",
-            owner=user
+            owner=shared_admin_user
         )
         
         assert survey.is_active is True
         assert survey.version == 1
         assert survey.description == ""
     
-    def test_survey_ordering(self):
+    def test_survey_ordering(self, shared_admin_user):
         """Test surveys are ordered by created_at descending."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        
-        survey1 = Survey.objects.create(title="First", owner=user)
-        survey2 = Survey.objects.create(title="Second", owner=user)
-        survey3 = Survey.objects.create(title="Third", owner=user)
+        survey1, survey2, survey3 = Survey.objects.bulk_create([
+            Survey(title=title, owner=shared_admin_user) for title in ("First", "Second", "Third")
+        ])
+        # auto_now_add overwrites created_at on insert, and one multi-row
+        # INSERT can stamp every row alike; spread them out afterwards
+        now = timezone.now()
+        for offset, survey in enumerate((survey3, survey2, survey1)):
+            survey.created_at = now - timedelta(seconds=offset)
+        Survey.objects.bulk_update([survey1, survey2, survey3], ["created_at"])
         
         surveys = list(Survey.objects.all())
         assert surveys[0] == survey3
@@ -85,16 +75,8 @@ class TestSurveyModel:
 class TestSectionModel:
     """Test Section model functionality."""
     
-    def test_create_section(self):
+    def test_create_section(self, survey):
         """Test creating a section."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         section = Section.objects.create(
             survey=survey,
             title="Personal Information",
@@ -108,29 +90,14 @@ class TestSectionModel:
         assert section.order == 0
         assert str(section) == "Test Survey - Personal Information"
     
-    def test_section_logic_rules_default(self):
+    def test_section_logic_rules_default(self, survey):
         """Test section logic_rules defaults to empty dict."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
         section = Section.objects.create(survey=survey, title="Test Section")
         
         assert section.logic_rules == {}
     
-    def test_section_logic_rules_storage(self):
+    def test_section_logic_rules_storage(self, survey):
         """Test storing complex logic rules in JSONB."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         logic_rules = {
             "conditions": [
                 {"field_id": "field-uuid", "operator": "equals", "value": "USA"}
@@ -149,15 +116,29 @@ class TestSectionModel:
         section.refresh_from_db()
         assert section.logic_rules == logic_rules
     
-    def test_section_cascade_delete(self):
-        """Test sections are deleted when survey is deleted."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
+    def test_logic_rules_containment_uses_gin_index(self, survey, django_assert_num_queries):
+        """Test a logic_rules containment filter is served by its GIN index."""
+        from django.db import connection, transaction
+        
+        section = Section.objects.create(
+            survey=survey,
+            title="Test Section",
+            logic_rules={"conditions": [], "logic": "and", "action": "show"}
         )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
+        Section.objects.create(survey=survey, title="Other Section", logic_rules={"logic": "or"})
+        queryset = Section.objects.filter(logic_rules__contains={"logic": "and"})
+        
+        with django_assert_num_queries(1):
+            assert list(queryset) == [section]
+        
+        # A handful of rows always favours a seq scan; rule it out to see the index is usable
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            assert "idx_sections_logic_rules_gin" in queryset.explain()
+    
+    def test_section_cascade_delete(self, survey):
+        """Test sections are deleted when survey is deleted."""
         section = Section.objects.create(survey=survey, title="Test Section")
         
         survey.delete()
@@ -169,17 +150,13 @@ class TestSectionModel:
 class TestFieldModel:
     """Test Field model functionality."""
     
-    def test_create_field(self):
+    @pytest.fixture
+    def section(self, survey):
+        """Create a section on the shared survey."""
+        return Section.objects.create(survey=survey, title="Test Section")
+    
+    def test_create_field(self, section):
         """Test creating a field."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Test Section")
-        
         field = Field.objects.create(
             section=section,
             field_type=FieldType.TEXT,
@@ -196,37 +173,19 @@ class TestFieldModel:
         assert field.is_required is True
         assert str(field) == "Test Section - Full Name"
     
-    def test_field_types(self):
-        """Test all field types are valid."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
+    @pytest.mark.parametrize("field_type", FieldType.values)
+    def test_field_types(self, section, field_type):
+        """Test every field type is valid."""
+        field = Field.objects.create(
+            section=section,
+            field_type=field_type,
+            label=f"Test {field_type}",
+            order=0
         )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Test Section")
-        
-        for field_type in FieldType.choices:
-            field = Field.objects.create(
-                section=section,
-                field_type=field_type[0],
-                label=f"Test {field_type[1]}",
-                order=0
-            )
-            assert field.field_type == field_type[0]
+        assert field.field_type == field_type
     
-    def test_field_options_storage(self):
+    def test_field_options_storage(self, section):
         """Test storing field options in JSONB."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Test Section")
-        
         options = [
             {"value": "usa", "label": "United States"},
             {"value": "uk", "label": "United Kingdom"},
@@ -240,20 +199,21 @@ class TestFieldModel:
             options=options
         )
         
-        field.refresh_from_db()
         assert field.options == options
     
-    def test_field_validation_rules(self):
-        """Test field validation configuration."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Test Section")
+    def test_options_containment_uses_gin_index(self):
+        """Test an options containment filter is served by its GIN index."""
+        from django.db import connection, transaction
+        
+        queryset = Field.objects.filter(options__contains=[{"value": "uk"}])
         
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            assert "idx_fields_options_gin" in queryset.explain()
+    
+    def test_field_validation_rules(self, section):
+        """Test field validation configuration."""
         field = Field.objects.create(
             section=section,
             field_type=FieldType.NUMBER,
@@ -268,17 +228,8 @@ class TestFieldModel:
         assert field.max_value == 100
         assert field.validation_message == "Age must be between 18 and 100"
     
-    def test_field_dependency_config(self):
+    def test_field_dependency_config(self, section):
         """Test cross-section dependency configuration."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Test Section")
-        
         dependency_config = {
             "depends_on": "country-field-uuid",
             "filter_by": "country"
@@ -291,20 +242,10 @@ class TestFieldModel:
             dependency_config=dependency_config
         )
         
-        field.refresh_from_db()
         assert field.dependency_config == dependency_config
     
-    def test_field_sensitive_flag(self):
+    def test_field_sensitive_flag(self, section):
         """Test marking fields as sensitive (PII)."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Test Section")
-        
         field = Field.objects.create(
             section=section,
             field_type=FieldType.EMAIL,
@@ -314,16 +255,8 @@ class TestFieldModel:
         
         assert field.is_sensitive is True
     
-    def test_field_cascade_delete(self):
+    def test_field_cascade_delete(self, section):
         """Test fields are deleted when section is deleted."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Test Section")
         field = Field.objects.create(
             section=section,
             field_type=FieldType.TEXT,
@@ -333,3 +266,138 @@ class TestFieldModel:
         section.delete()
         
         assert not Field.objects.filter(id=field.id).exists()
+
+
+@pytest.mark.django_db
+class TestSurveyCacheInvalidation:
+    """Test model writes drop the cached survey structure."""
+    
+    def test_field_save_invalidates_structure(self, complete_survey, django_capture_on_commit_callbacks):
+        from apps.surveys.cache import get_survey_structure
+        
+        before = get_survey_structure(complete_survey.id)
+        field = Field.objects.get(section__survey=complete_survey, label="Full Name")
+        field.label = "Renamed"
+        with django_capture_on_commit_callbacks(execute=True):
+            field.save()
+        
+        after = get_survey_structure(complete_survey.id)
+        assert before[0].fields[0].label == "Full Name"
+        assert after[0].fields[0].label == "Renamed"
+    
+    def test_section_delete_invalidates_structure(self, complete_survey, django_capture_on_commit_callbacks):
+        from apps.surveys.cache import get_survey_structure
+        
+        assert len(get_survey_structure(complete_survey.id)) == 2
+        with django_capture_on_commit_callbacks(execute=True):
+            complete_survey.sections.get(order=1).delete()
+        
+        assert len(get_survey_structure(complete_survey.id)) == 1
+    
+    def test_cascade_delete_skips_per_field_invalidation(
+        self, complete_survey, mocker, django_capture_on_commit_callbacks
+    ):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        section_count = complete_survey.sections.count()
+        invalidate = mocker.patch("apps.surveys.cache.invalidate_survey_cache")
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                complete_survey.delete()
+        
+        # The survey and each section invalidate; their fields do not
+        assert invalidate.call_count == 1 + section_count
+        assert len([q for q in queries.captured_queries if q["sql"].startswith("SELECT")]) == 2
+    
+    def test_survey_save_invalidates_active_flag(
+        self, complete_survey, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        from apps.surveys.cache import is_survey_active
+        
+        assert is_survey_active(complete_survey.id) is True
+        with django_assert_num_queries(0):
+            assert is_survey_active(complete_survey.id) is True
+        
+        complete_survey.is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            complete_survey.save()
+        
+        assert is_survey_active(complete_survey.id) is False
+    
+    def test_invalidation_waits_for_commit(self, complete_survey, django_capture_on_commit_callbacks):
+        from django.core.cache import cache
+        from apps.surveys.cache import get_survey_structure, get_survey_structure_cache_key
+        
+        get_survey_structure(complete_survey.id)
+        key = get_survey_structure_cache_key(complete_survey.id)
+        
+        with django_capture_on_commit_callbacks() as callbacks:
+            complete_survey.sections.get(order=1).delete()
+            assert cache.get(key) is not None
+        
+        for callback in callbacks:
+            callback()
+        assert cache.get(key) is None
+    
+    def test_unknown_survey_is_cached_inactive(self, django_assert_num_queries):
+        import uuid
+        from apps.surveys.cache import is_survey_active
+        
+        survey_id = uuid.uuid4()
+        assert is_survey_active(survey_id) is False
+        with django_assert_num_queries(0):
+            assert is_survey_active(survey_id) is False
+    
+    def test_invalidate_all_clears_tracked_surveys(self, complete_survey):
+        from django.core.cache import cache
+        from apps.surveys.cache import (
+            get_cached_survey,
+            get_survey_structure,
+            get_survey_structure_cache_key,
+            invalidate_all_survey_caches,
+            set_cached_survey,
+        )
+        
+        get_survey_structure(complete_survey.id)
+        set_cached_survey(complete_survey.id, {"title": "Complete Survey"})
+        
+        invalidate_all_survey_caches()
+        
+        assert get_cached_survey(complete_survey.id) is None
+        assert cache.get(get_survey_structure_cache_key(complete_survey.id)) is None
+    
+    def test_invalidate_all_clears_active_flags(self, complete_survey):
+        from django.core.cache import cache
+        from apps.surveys.cache import (
+            get_survey_active_cache_key,
+            invalidate_all_survey_caches,
+            is_survey_active,
+        )
+        
+        # Only the flags are cached, so is_survey_active itself must track them
+        assert is_survey_active(complete_survey.id) is True
+        
+        invalidate_all_survey_caches()
+        
+        assert cache.get(get_survey_active_cache_key(complete_survey.id)) is None
+    
+    def test_unknown_surveys_are_not_tracked(self):
+        import uuid
+        from django.core.cache import cache
+        from django_redis import get_redis_connection
+        from apps.surveys.cache import SURVEY_INDEX_KEY, is_survey_active
+        
+        unknown_id = uuid.uuid4()
+        assert is_survey_active(unknown_id) is False
+        
+        tracked = get_redis_connection("default").smembers(cache.make_key(SURVEY_INDEX_KEY))
+        assert str(unknown_id).encode() not in tracked
+    
+    def test_active_survey_title_is_cached(self, complete_survey, django_assert_num_queries):
+        from apps.surveys.cache import get_active_survey_title
+        
+        assert get_active_survey_title(complete_survey.id) == complete_survey.title
+        with django_assert_num_queries(0):
+            assert get_active_survey_title(complete_survey.id) == complete_survey.title
@@ -1,9 +1,10 @@
 """Unit tests for Survey serializers."""
+from types import SimpleNamespace
+
 import pytest
 from django.contrib.auth import get_user_model
-from rest_framework.test import APIRequestFactory
-from conftest import create_user_with_group
-from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
+from django.db.models import Count
+from rest_framework import serializers
 
 from apps.surveys.models import Field, FieldType, Section, Survey
 from apps.surveys.serializers import (
@@ -22,15 +23,8 @@ User = get_user_model()
 class TestFieldSerializer:
     """Test FieldSerializer."""
     
-    def test_serialize_field(self):
+    def test_serialize_field(self, survey):
         """Test serializing a field."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
         section = Section.objects.create(survey=survey, title="Test Section")
         field = Field.objects.create(
             section=section,
@@ -70,15 +64,8 @@ class TestFieldSerializer:
 class TestSectionSerializer:
     """Test SectionSerializer."""
     
-    def test_serialize_section_with_fields(self):
+    def test_serialize_section_with_fields(self, survey):
         """Test serializing a section with nested fields."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
         section = Section.objects.create(
             survey=survey,
             title="Personal Info",
@@ -112,25 +99,24 @@ class TestSectionSerializer:
 class TestSurveyListSerializer:
     """Test SurveyListSerializer."""
     
-    def test_serialize_survey_list(self):
+    def test_serialize_survey_list(self, shared_admin_user, django_assert_num_queries):
         """Test serializing survey for list view."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
         survey = Survey.objects.create(
             title="Test Survey",
             description="Test Description",
-            owner=user,
+            owner=shared_admin_user,
             is_active=True
         )
-        Section.objects.create(survey=survey, title="Section 1")
-        Section.objects.create(survey=survey, title="Section 2")
+        Section.objects.bulk_create([
+            Section(survey=survey, title=f"Section {i + 1}", order=i) for i in range(2)
+        ])
+        # Loaded the way SurveyViewSet.get_queryset loads list rows
+        survey = Survey.objects.select_related("owner").annotate(
+            section_count=Count("sections")
+        ).get(pk=survey.pk)
         
-        serializer = SurveyListSerializer(survey)
-        data = serializer.data
+        with django_assert_num_queries(0):
+            data = SurveyListSerializer(survey).data
         
         assert data["title"] == "Test Survey"
         assert data["owner_email"] == "test@example.com"
@@ -143,49 +129,56 @@ class TestSurveyListSerializer:
 class TestSurveyDetailSerializer:
     """Test SurveyDetailSerializer."""
     
-    def test_serialize_survey_detail(self):
+    def test_serialize_survey_detail(self, survey, django_assert_num_queries):
         """Test serializing full survey with sections and fields."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        section = Section.objects.create(survey=survey, title="Section 1", order=0)
-        Field.objects.create(
-            section=section,
-            field_type=FieldType.TEXT,
-            label="Name",
-            order=0
-        )
+        sections = Section.objects.bulk_create([
+            Section(survey=survey, title=f"Section {i + 1}", order=i) for i in range(10)
+        ])
+        Field.objects.bulk_create([
+            Field(section=section, field_type=FieldType.TEXT, label=f"Question {j + 1}", order=j)
+            for section in sections
+            for j in range(5)
+        ])
+        survey = Survey.objects.select_related("owner").get(pk=survey.pk)
         
-        serializer = SurveyDetailSerializer(survey)
-        data = serializer.data
+        # One query for the sections and one for all their fields, however many there are
+        with django_assert_num_queries(2):
+            data = SurveyDetailSerializer(survey).data
         
         assert data["title"] == "Test Survey"
         assert data["owner_email"] == "test@example.com"
-        assert len(data["sections"]) == 1
+        assert len(data["sections"]) == 10
         assert data["sections"][0]["title"] == "Section 1"
-        assert len(data["sections"][0]["fields"]) == 1
+        assert [len(section["fields"]) for section in data["sections"]] == [5] * 10
+        assert data["sections"][0]["fields"][0]["label"] == "Question 1"
+    
+    def test_detail_matches_nested_serializers(self, complete_survey):
+        """Test the hand-built payload equals the nested ModelSerializer output."""
+        data = SurveyDetailSerializer(complete_survey).data
+        
+        assert data["id"] == str(complete_survey.id)
+        assert data["owner"] == complete_survey.owner_id
+        assert data["created_at"] == serializers.DateTimeField().to_representation(
+            complete_survey.created_at
+        )
+        assert data["sections"] == SectionSerializer(
+            complete_survey.sections.order_by("order"), many=True
+        ).data
 
 
 @pytest.mark.django_db
 class TestSurveyCreateSerializer:
     """Test SurveyCreateSerializer."""
     
-    def test_create_survey_with_sections_and_fields(self):
+    @pytest.fixture
+    def context(self, shared_admin_user):
+        """Serializer context; create() only reads the request's user."""
+        return {"request": SimpleNamespace(user=shared_admin_user)}
+    
+    def test_create_survey_with_sections_and_fields(self, shared_admin_user, context):
         """Test creating a complete survey with nested data."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        
-        factory = APIRequestFactory()
-        request = factory.post("/api/v1/surveys/")
-        request.user = user
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
         
         data = {
             "title": "Customer Feedback",
@@ -236,73 +229,137 @@ class TestSurveyCreateSerializer:
             ]
         }
         
-        serializer = SurveyCreateSerializer(data=data, context={"request": request})
+        serializer = SurveyCreateSerializer(data=data, context=context)
         assert serializer.is_valid(), serializer.errors
         
-        survey = serializer.save()
+        with CaptureQueriesContext(connection) as queries:
+            survey = serializer.save()
+        
+        # Survey, sections, fields: one INSERT each (plus the atomic block's savepoint)
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 3
+        
+        # Reload the whole tree in one go and assert against it in memory
+        survey = Survey.objects.prefetch_related("sections__fields").get(pk=survey.pk)
+        sections = {section.order: section for section in survey.sections.all()}
+        fields = {
+            order: {field.order: field for field in section.fields.all()}
+            for order, section in sections.items()
+        }
         
         assert survey.title == "Customer Feedback"
-        assert survey.owner == user
-        assert survey.sections.count() == 2
+        assert survey.owner_id == shared_admin_user.id
+        assert len(sections) == 2
         
-        section1 = survey.sections.get(order=0)
-        assert section1.title == "Personal Information"
-        assert section1.fields.count() == 2
+        assert sections[0].title == "Personal Information"
+        assert len(fields[0]) == 2
         
-        section2 = survey.sections.get(order=1)
-        assert section2.title == "Feedback"
-        assert section2.fields.count() == 2
+        assert sections[1].title == "Feedback"
+        assert len(fields[1]) == 2
         
         # Verify field details
-        name_field = section1.fields.get(order=0)
+        name_field = fields[0][0]
         assert name_field.label == "Full Name"
         assert name_field.is_required is True
         
-        email_field = section1.fields.get(order=1)
+        email_field = fields[0][1]
         assert email_field.is_sensitive is True
     
-    def test_create_survey_without_sections(self):
+    def test_create_survey_without_sections(self, context):
         """Test creating a survey without sections."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        
-        factory = APIRequestFactory()
-        request = factory.post("/api/v1/surveys/")
-        request.user = user
-        
         data = {
             "title": "Empty Survey",
             "description": "No sections yet",
             "is_active": False
         }
         
-        serializer = SurveyCreateSerializer(data=data, context={"request": request})
+        serializer = SurveyCreateSerializer(data=data, context=context)
         assert serializer.is_valid()
         
         survey = serializer.save()
         
         assert survey.title == "Empty Survey"
         assert survey.sections.count() == 0
+    
+    def test_unknown_nested_keys_are_rejected(self):
+        """Test every unknown section/field key is reported before anything is created."""
+        data = {
+            "title": "Bad Survey",
+            "sections": [
+                {"title": "Section", "colour": "red", "fields": [
+                    {"field_type": "text", "label": "Q1"},
+                    {"field_type": "text", "label": "Q2", "section": "x", "id": "y"},
+                ]},
+                "not a section",
+            ]
+        }
+        
+        serializer = SurveyCreateSerializer(data=data)
+        
+        assert not serializer.is_valid()
+        assert serializer.errors["sections"] == [
+            "sections[0]: unknown keys colour.",
+            "sections[1]: expected an object.",
+            "sections[0].fields[1]: unknown keys id, section.",
+        ]
+        assert not Survey.objects.filter(title="Bad Survey").exists()
+    
+    def test_create_inserts_sections_and_fields_in_bulk(self, context):
+        """Test nested sections and fields cost one INSERT per table."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        data = {
+            "title": "Large Survey",
+            "sections": [
+                {
+                    "title": f"Section {s}",
+                    "fields": [{"field_type": "text", "label": f"Q{f}"} for f in range(5)]
+                }
+                for s in range(4)
+            ]
+        }
+        
+        serializer = SurveyCreateSerializer(data=data, context=context)
+        assert serializer.is_valid(), serializer.errors
+        with CaptureQueriesContext(connection) as queries:
+            survey = serializer.save()
+        
+        inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 3
+        assert list(survey.sections.values_list("order", flat=True)) == [0, 1, 2, 3]
+        # The nested payload is read, not consumed
+        assert [len(s["fields"]) for s in serializer.validated_data["sections"]] == [5] * 4
+        assert list(
+            Field.objects.filter(section__survey=survey, section__order=3).values_list("order", flat=True)
+        ) == [0, 1, 2, 3, 4]
+    
+    def test_create_indexes_filterable_fields(self, context, mocker, django_capture_on_commit_callbacks):
+        """Test bulk-created filterable fields get their response index once committed."""
+        delay = mocker.patch("apps.surveys.serializers.sync_response_field_index.delay")
+        data = {
+            "title": "Filtered Survey",
+            "sections": [{"title": "Section", "fields": [
+                {"field_type": "text", "label": "Plain"},
+                {"field_type": "text", "label": "Region", "is_filterable": True},
+            ]}]
+        }
+        
+        serializer = SurveyCreateSerializer(data=data, context=context)
+        assert serializer.is_valid(), serializer.errors
+        with django_capture_on_commit_callbacks(execute=True):
+            survey = serializer.save()
+        
+        region = Field.objects.get(section__survey=survey, label="Region")
+        delay.assert_called_once_with(str(region.id), True)
 
 
 @pytest.mark.django_db
 class TestSectionCreateSerializer:
     """Test SectionCreateSerializer."""
     
-    def test_create_section_with_fields(self):
+    def test_create_section_with_fields(self, survey):
         """Test creating a section with nested fields."""
-        user = create_user_with_group(
-            username="test",
-            email="test@example.com",
-            password="testpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-        survey = Survey.objects.create(title="Test Survey", owner=user)
-        
         data = {
             "title": "Contact Information",
             "description": "How to reach you",
@@ -335,3 +392,13 @@ class TestSectionCreateSerializer:
         phone_field = section.fields.get(order=0)
         assert phone_field.field_type == "phone"
         assert phone_field.label == "Phone Number"
+    
+    def test_unknown_field_keys_are_rejected(self):
+        """Test unknown nested field keys fail validation instead of raising TypeError."""
+        serializer = SectionCreateSerializer(data={
+            "title": "Contact",
+            "fields": [{"field_type": "email", "label": "Email", "created_at": "now"}]
+        })
+        
+        assert not serializer.is_valid()
+        assert serializer.errors["fields"] == ["fields[0]: unknown keys created_at."]
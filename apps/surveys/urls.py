@@ -1,5 +1,4 @@
 """URL routes for Survey API endpoints."""
-from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
 
@@ -17,8 +16,6 @@ surveys_router.register(r"sections", SectionViewSet, basename="survey-sections")
 sections_router = routers.NestedDefaultRouter(surveys_router, r"sections", lookup="section")
 sections_router.register(r"fields", FieldViewSet, basename="section-fields")
 
-urlpatterns = [
-    path("", include(router.urls)),
-    path("", include(surveys_router.urls)),
-    path("", include(sections_router.urls)),
-]
+# One flat list rather than three include("") subtrees, so a request walks
+# a single resolver level; each router builds its .urls once and caches it
+urlpatterns = [*router.urls, *surveys_router.urls, *sections_router.urls]
@@ -1,22 +1,28 @@
 """Views for Survey, Section, and Field API endpoints."""
-from django.db.models import Prefetch
+from django.db import transaction
+from django.db.models import Count, Prefetch
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.audit.middleware import set_audit_changes
+from apps.responses.tasks import sync_response_field_index
 from apps.users.permissions import CanManageSurvey
 
-from .cache import get_cached_survey, invalidate_survey_cache, set_cached_survey
+from .cache import get_cached_survey, is_survey_active, set_cached_survey
 from .models import Field, Section, Survey
 from .serializers import (
+    FIELD_BATCH_SIZE,
+    SECTION_BATCH_SIZE,
     FieldSerializer,
     SectionCreateSerializer,
     SectionSerializer,
     SurveyCreateSerializer,
     SurveyDetailSerializer,
     SurveyListSerializer,
+    index_filterable_fields,
 )
 
 
@@ -38,12 +44,25 @@ class SurveyViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Optimized queryset with prefetch for nested data."""
-        return Survey.objects.select_related("owner").prefetch_related(
-            Prefetch(
-                "sections",
-                queryset=Section.objects.prefetch_related("fields").order_by("order")
+        queryset = Survey.objects.select_related("owner").order_by("-created_at")
+        if self.action == "list":
+            # Only SurveyListSerializer's columns (the owner row is mostly
+            # auth fields it never reads); sections counted in the same query
+            return queryset.only(
+                "id", "title", "description", "is_active", "version",
+                "created_at", "updated_at", "owner__email",
+            ).annotate(section_count=Count("sections"))
+        if self.action == "duplicate":
+            # Copied row by row; SurveyDetailSerializer loads its own tree
+            return queryset.prefetch_related(
+                Prefetch(
+                    "sections",
+                    queryset=Section.objects.order_by("order").prefetch_related(
+                        Prefetch("fields", queryset=Field.objects.order_by("order"))
+                    )
+                )
             )
-        ).order_by("-created_at")
+        return queryset
     
     def get_serializer_class(self):
         if self.action == "list":
@@ -70,24 +89,22 @@ class SurveyViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.data)
     
-    def update(self, request, *args, **kwargs):
-        """Update survey and invalidate cache."""
-        response = super().update(request, *args, **kwargs)
-        invalidate_survey_cache(kwargs.get("pk"))
-        return response
-    
-    def partial_update(self, request, *args, **kwargs):
-        """Partial update survey and invalidate cache."""
-        response = super().partial_update(request, *args, **kwargs)
-        invalidate_survey_cache(kwargs.get("pk"))
-        return response
+    def perform_update(self, serializer):
+        """Save and report the changed fields to the audit middleware."""
+        instance = serializer.instance
+        changes = {
+            name: {"old": getattr(instance, name), "new": value}
+            for name, value in serializer.validated_data.items()
+            if getattr(instance, name) != value
+        }
+        serializer.save()
+        set_audit_changes(self.request, changes)
     
     def destroy(self, request, *args, **kwargs):
-        """Soft delete survey and invalidate cache."""
+        """Soft delete survey (the save invalidates its cache, see signals)."""
         instance = self.get_object()
         instance.is_active = False
         instance.save()
-        invalidate_survey_cache(kwargs.get("pk"))
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(detail=True, methods=["post"])
@@ -95,43 +112,50 @@ class SurveyViewSet(viewsets.ModelViewSet):
         """Create a copy of an existing survey."""
         survey = self.get_object()
         
-        # Create new survey
-        new_survey = Survey.objects.create(
-            title=f"{survey.title} (Copy)",
-            description=survey.description,
-            owner=request.user,
-            is_active=False,
-        )
-        
-        # Copy sections and fields
-        # TODO: refactor this to use bulk_create
-        for section in survey.sections.all():
-            new_section = Section.objects.create(
-                survey=new_survey,
-                title=section.title,
-                description=section.description,
-                order=section.order,
-                logic_rules=section.logic_rules,
+        with transaction.atomic():
+            # Create new survey
+            new_survey = Survey.objects.create(
+                title=f"{survey.title} (Copy)",
+                description=survey.description,
+                owner=request.user,
+                is_active=False,
             )
-            for field in section.fields.all():
-                Field.objects.create(
-                    section=new_section,
-                    field_type=field.field_type,
-                    label=field.label,
-                    placeholder=field.placeholder,
-                    help_text=field.help_text,
-                    options=field.options,
-                    is_required=field.is_required,
-                    validation_regex=field.validation_regex,
-                    validation_message=field.validation_message,
-                    min_value=field.min_value,
-                    max_value=field.max_value,
-                    logic_rules=field.logic_rules,
-                    dependency_config=field.dependency_config,
-                    is_sensitive=field.is_sensitive,
-                    order=field.order,
+            
+            # Copy sections and fields from the prefetched tree, one INSERT each
+            new_sections, new_fields = [], []
+            for section in survey.sections.all():
+                new_section = Section(
+                    survey=new_survey,
+                    title=section.title,
+                    description=section.description,
+                    order=section.order,
+                    logic_rules=section.logic_rules,
                 )
-        
+                new_sections.append(new_section)
+                new_fields += [
+                    Field(
+                        section=new_section,
+                        field_type=field.field_type,
+                        label=field.label,
+                        placeholder=field.placeholder,
+                        help_text=field.help_text,
+                        options=field.options,
+                        is_required=field.is_required,
+                        validation_regex=field.validation_regex,
+                        validation_message=field.validation_message,
+                        min_value=field.min_value,
+                        max_value=field.max_value,
+                        logic_rules=field.logic_rules,
+                        dependency_config=field.dependency_config,
+                        is_sensitive=field.is_sensitive,
+                        is_filterable=field.is_filterable,
+                        order=field.order,
+                    )
+                    for field in section.fields.all()
+                ]
+            Section.objects.bulk_create(new_sections, batch_size=SECTION_BATCH_SIZE)
+            Field.objects.bulk_create(new_fields, batch_size=FIELD_BATCH_SIZE)
+            index_filterable_fields(new_fields)
         serializer = SurveyDetailSerializer(new_survey)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -154,16 +178,6 @@ class SectionViewSet(viewsets.ModelViewSet):
         survey_pk = self.kwargs.get("survey_pk")
         survey = Survey.objects.get(pk=survey_pk)
         serializer.save(survey=survey)
-        invalidate_survey_cache(survey_pk)
-    
-    def perform_update(self, serializer):
-        serializer.save()
-        invalidate_survey_cache(self.kwargs.get("survey_pk"))
-    
-    def perform_destroy(self, instance):
-        survey_pk = self.kwargs.get("survey_pk")
-        instance.delete()
-        invalidate_survey_cache(survey_pk)
 
 
 class FieldViewSet(viewsets.ModelViewSet):
@@ -179,17 +193,26 @@ class FieldViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         section_pk = self.kwargs.get("section_pk")
         section = Section.objects.get(pk=section_pk)
-        serializer.save(section=section)
-        invalidate_survey_cache(section.survey_id)
+        instance = serializer.save(section=section)
+        if instance.is_filterable:
+            self._sync_response_index(instance.id, True)
     
     def perform_update(self, serializer):
+        was_filterable = serializer.instance.is_filterable
         instance = serializer.save()
-        invalidate_survey_cache(instance.section.survey_id)
+        if instance.is_filterable != was_filterable:
+            self._sync_response_index(instance.id, instance.is_filterable)
     
-    def perform_destroy(self, instance):
-        survey_id = instance.section.survey_id
-        instance.delete()
-        invalidate_survey_cache(survey_id)
+    @staticmethod
+    def _sync_response_index(field_id, filterable):
+        """
+        Build or drop the field's response index once the change is committed.
+        Deletes, including cascades from a section or survey, are handled by
+        the Field post_delete receiver in signals.
+        """
+        transaction.on_commit(
+            lambda: sync_response_field_index.delay(str(field_id), filterable)
+        )
 
 
 class PublicSurveyView(APIView):
@@ -204,25 +227,20 @@ class PublicSurveyView(APIView):
     
     def get(self, request, survey_id, version=None):
         """Retrieve active survey for public access."""
-        # Try cache first
+        # Both caches are dropped by the Survey/Section/Field signals, so a
+        # warm survey is served without touching the database
+        if not is_survey_active(survey_id):
+            return Response(
+                {"error": "Survey not found or inactive"},
+                status=status.HTTP_404_NOT_FOUND
+            )
         cached_data = get_cached_survey(survey_id)
         if cached_data:
-            # Verify survey is still active
-            try:
-                survey = Survey.objects.only('is_active').get(id=survey_id)
-                if survey.is_active:
-                    return Response(cached_data)
-            except Survey.DoesNotExist:
-                pass
+            return Response(cached_data)
         
-        # Cache miss or inactive - fetch from DB
+        # Cache miss - fetch from DB
         try:
-            survey = Survey.objects.select_related("owner").prefetch_related(
-                Prefetch(
-                    "sections",
-                    queryset=Section.objects.prefetch_related("fields").order_by("order")
-                )
-            ).get(id=survey_id, is_active=True)
+            survey = Survey.objects.select_related("owner").get(id=survey_id, is_active=True)
         except Survey.DoesNotExist:
             return Response(
                 {"error": "Survey not found or inactive"},
@@ -83,6 +83,15 @@ DATABASES = {
         "PASSWORD": config("DB_PASSWORD", default="adsp_password"),
         "HOST": config("DB_HOST", default="localhost"),
         "PORT": config("DB_PORT", default="5432"),
+        # Reuse connections across requests (and audit writer batches)
+        # instead of reconnecting each time; health checks drop dead ones
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+        # Behind PgBouncer in transaction mode a named cursor can outlive the
+        # backend it was opened on; .iterator() then fetches client-side
+        "DISABLE_SERVER_SIDE_CURSORS": config(
+            "DB_DISABLE_SERVER_SIDE_CURSORS", default=False, cast=bool
+        ),
     }
 }
 
@@ -104,6 +113,34 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
+CELERY_BEAT_SCHEDULE = {
+    "ensure-audit-log-partitions": {
+        "task": "apps.audit.tasks.ensure_audit_log_partitions",
+        "schedule": 60 * 60 * 24,  # daily
+    },
+}
+
+# Audit logging
+# Batch audit INSERTs on a background thread instead of writing inline per request
+AUDIT_ASYNC_WRITES = config("AUDIT_ASYNC_WRITES", default=True, cast=bool)
+
+# Survey submissions
+# Surveys with more visibility conditions than this have their conditional
+# logic validated after commit (validate_logic_async) instead of in the request
+LOGIC_DEFERRED_VALIDATION_THRESHOLD = config(
+    "LOGIC_DEFERRED_VALIDATION_THRESHOLD", default=100, cast=int
+)
+
+# Response exports
+# Above this many responses the synchronous CSV download is refused (413);
+# use the async export endpoint instead
+RESPONSE_DOWNLOAD_MAX_ROWS = config("RESPONSE_DOWNLOAD_MAX_ROWS", default=10_000, cast=int)
+# Async exports hold PII: they are written outside MEDIA_ROOT and served only
+# through the signed link emailed to the requester, valid for this many seconds
+RESPONSE_EXPORT_ROOT = config("RESPONSE_EXPORT_ROOT", default=str(BASE_DIR / "exports"))
+RESPONSE_EXPORT_LINK_MAX_AGE = config("RESPONSE_EXPORT_LINK_MAX_AGE", default=60 * 60 * 24, cast=int)
+# Public base URL for links in emails sent outside a request (e.g. by Celery)
+SITE_URL = config("SITE_URL", default="http://localhost:8000")
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
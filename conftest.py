@@ -5,17 +5,21 @@ This module provides common fixtures used across all test modules.
 """
 import pytest
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
+from django.test import override_settings
 from rest_framework.test import APIClient
 
 from apps.surveys.models import Field, FieldType, Section, Survey
+from apps.surveys.tests.factories import get_group
 from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
 
 User = get_user_model()
 
 
-def create_user_with_group(username, email, password, group_name):
-    """Helper function to create a user with a specific group."""
+def create_user_with_group(username, email, password=None, group_name=None):
+    """
+    Helper function to create a user with a specific group.
+    Without a password the user gets an unusable one and no hash is computed.
+    """
     user = User.objects.create_user(
         username=username,
         email=email,
@@ -23,11 +27,17 @@ def create_user_with_group(username, email, password, group_name):
         is_active=True
     )
     if group_name:
-        group, _ = Group.objects.get_or_create(name=group_name)
-        user.groups.add(group)
+        user.groups.add(get_group(group_name))
     return user
 
 
+def make_surveys(n, owner, **kwargs):
+    """Helper function to insert n surveys owned by owner in one query."""
+    return Survey.objects.bulk_create(
+        [Survey(title=f"Survey {i + 1}", owner=owner, **kwargs) for i in range(n)]
+    )
+
+
 @pytest.fixture
 def api_client():
     """Create a DRF API client for testing."""
@@ -56,6 +66,26 @@ def analyst_user(db):
     )
 
 
+@pytest.fixture(scope="module")
+def shared_admin_user(django_db_setup, django_db_blocker):
+    """One survey admin committed per test module; tests roll back around it."""
+    with django_db_blocker.unblock():
+        user = create_user_with_group(
+            username="test",
+            email="test@example.com",
+            group_name=SURVEY_ADMIN_GROUP
+        )
+    yield user
+    with django_db_blocker.unblock():
+        user.delete()
+
+
+@pytest.fixture
+def survey(db, shared_admin_user):
+    """Create a bare survey owned by the shared admin."""
+    return Survey.objects.create(title="Test Survey", owner=shared_admin_user)
+
+
 @pytest.fixture
 def viewer_user(db):
     """Create a viewer user."""
@@ -245,6 +275,26 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hasher():
+    """Hash test passwords with MD5; PBKDF2 dominates user-creating tests."""
+    with override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def reset_factory_groups():
+    """Forget groups looked up by the factories; the test's rollback removes them."""
+    yield
+    get_group.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def synchronous_audit_writes(settings):
+    """Write audit entries inline so they land inside the test transaction."""
+    settings.AUDIT_ASYNC_WRITES = False
+
+
 @pytest.fixture
 def mock_redis(mocker):
     """Mock Redis for testing without actual Redis connection."""
@@ -15,9 +15,8 @@ Run with: pytest tests/security/test_security.py -v
 import pytest
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.test import APIClient
 from conftest import create_user_with_group
-from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
+from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_VIEWER_GROUP
 
 from apps.responses.models import Response
 from apps.surveys.models import Field, FieldType, Section, Survey
@@ -29,21 +28,6 @@ User = get_user_model()
 class TestSQLInjectionPrevention:
     """Test SQL injection attack prevention."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
     def test_sql_injection_in_survey_title(self, api_client, admin_user):
         """Test SQL injection attempt in survey title."""
         api_client.force_authenticate(user=admin_user)
@@ -112,21 +96,6 @@ class TestSQLInjectionPrevention:
 class TestXSSPrevention:
     """Test XSS (Cross-Site Scripting) prevention."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
     def test_xss_in_survey_title(self, api_client, admin_user):
         """Test XSS attempt in survey title."""
         api_client.force_authenticate(user=admin_user)
@@ -187,11 +156,6 @@ class TestXSSPrevention:
 class TestAuthenticationSecurity:
     """Test authentication and authorization security."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
     def test_unauthenticated_access_to_protected_endpoints(self, api_client):
         """Test that protected endpoints require authentication."""
         protected_endpoints = [
@@ -278,21 +242,6 @@ class TestAuthenticationSecurity:
 class TestInputValidation:
     """Test input validation and sanitization."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
     def test_email_field_validation(self, api_client, admin_user):
         """Test email field validates email format."""
         api_client.force_authenticate(user=admin_user)
@@ -405,21 +354,6 @@ class TestInputValidation:
 class TestSensitiveDataHandling:
     """Test sensitive data (PII) handling."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
     def test_sensitive_fields_marked_correctly(self, api_client, admin_user):
         """Test that sensitive fields are properly marked."""
         api_client.force_authenticate(user=admin_user)
@@ -485,21 +419,6 @@ class TestSensitiveDataHandling:
 class TestJSONBInjection:
     """Test JSONB injection prevention."""
     
-    @pytest.fixture
-    def api_client(self):
-        """Create API client."""
-        return APIClient()
-    
-    @pytest.fixture
-    def admin_user(self):
-        """Create admin user."""
-        return create_user_with_group(
-            username="admin",
-            email="admin@example.com",
-            password="adminpass123",
-            group_name=SURVEY_ADMIN_GROUP
-        )
-    
     def test_malicious_logic_rules(self, api_client, admin_user):
         """Test malicious JSON in logic_rules field."""
         api_client.force_authenticate(user=admin_user)
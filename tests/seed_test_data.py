@@ -10,16 +10,21 @@ Usage:
     from tests.seed_test_data import seed_all_data
     seed_all_data()
 """
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.db import transaction
 
-from apps.responses.models import PartialResponse, Response
+from apps.responses.models import PartialResponse, Response, ValidationStatus
 from apps.surveys.models import Field, FieldType, Section, Survey
 from apps.users.models import SURVEY_ADMIN_GROUP, SURVEY_ANALYST_GROUP, SURVEY_VIEWER_GROUP
 
 User = get_user_model()
 
+# Rows per INSERT when seeding; Response and PartialResponse have no save() signals
+SEED_BATCH_SIZE = 1000
+
 
 @transaction.atomic
 def seed_users():
@@ -323,52 +328,59 @@ def seed_responses(surveys):
     """Create test responses."""
     print("Creating responses...")
     
-    responses_created = 0
+    responses = []
     
     for survey in surveys:
+        fields = [
+            field
+            for section in survey.sections.prefetch_related("fields")
+            for field in section.fields.all()
+        ]
+        
         # Create 5-10 responses per survey
         for i in range(5):
             response_data = {}
             
-            for section in survey.sections.all():
-                for field in section.fields.all():
-                    field_id = str(field.id)
-                    
-                    # Generate sample data based on field type
-                    if field.field_type == FieldType.TEXT:
-                        response_data[field_id] = f"Sample text {i}"
-                    elif field.field_type == FieldType.EMAIL:
-                        response_data[field_id] = f"user{i}@example.com"
-                    elif field.field_type == FieldType.PHONE:
-                        response_data[field_id] = f"+1-555-{1000 + i}"
-                    elif field.field_type == FieldType.NUMBER:
-                        response_data[field_id] = i + 1
-                    elif field.field_type == FieldType.RATING:
-                        response_data[field_id] = (i % 5) + 1
-                    elif field.field_type == FieldType.SELECT:
-                        if field.options:
-                            response_data[field_id] = field.options[i % len(field.options)]["value"]
-                    elif field.field_type == FieldType.MULTISELECT:
-                        if field.options:
-                            response_data[field_id] = [opt["value"] for opt in field.options[:2]]
-                    elif field.field_type == FieldType.CHECKBOX:
-                        if field.options:
-                            response_data[field_id] = [field.options[0]["value"]]
-                    elif field.field_type == FieldType.TEXTAREA:
-                        response_data[field_id] = f"This is a longer text response for iteration {i}. It contains multiple sentences."
-                    elif field.field_type == FieldType.DATE:
-                        response_data[field_id] = "1990-01-01"
+            for field in fields:
+                field_id = str(field.id)
+                
+                # Generate sample data based on field type
+                if field.field_type == FieldType.TEXT:
+                    response_data[field_id] = f"Sample text {i}"
+                elif field.field_type == FieldType.EMAIL:
+                    response_data[field_id] = f"user{i}@example.com"
+                elif field.field_type == FieldType.PHONE:
+                    response_data[field_id] = f"+1-555-{1000 + i}"
+                elif field.field_type == FieldType.NUMBER:
+                    response_data[field_id] = i + 1
+                elif field.field_type == FieldType.RATING:
+                    response_data[field_id] = (i % 5) + 1
+                elif field.field_type == FieldType.SELECT:
+                    if field.options:
+                        response_data[field_id] = field.options[i % len(field.options)]["value"]
+                elif field.field_type == FieldType.MULTISELECT:
+                    if field.options:
+                        response_data[field_id] = [opt["value"] for opt in field.options[:2]]
+                elif field.field_type == FieldType.CHECKBOX:
+                    if field.options:
+                        response_data[field_id] = [field.options[0]["value"]]
+                elif field.field_type == FieldType.TEXTAREA:
+                    response_data[field_id] = f"This is a longer text response for iteration {i}. It contains multiple sentences."
+                elif field.field_type == FieldType.DATE:
+                    response_data[field_id] = "1990-01-01"
             
-            Response.objects.create(
+            responses.append(Response(
                 survey=survey,
                 data=response_data,
                 ip_address=f"192.168.1.{i + 1}",
                 user_agent="Mozilla/5.0 (Test Data)",
-                completion_time_seconds=120 + (i * 10)
-            )
-            responses_created += 1
+                completion_time_seconds=120 + (i * 10),
+                validation_status=ValidationStatus.VALID
+            ))
+    
+    Response.objects.bulk_create(responses, batch_size=SEED_BATCH_SIZE)
     
-    print(f"Created {responses_created} responses")
+    print(f"Created {len(responses)} responses")
 
 
 @transaction.atomic
@@ -376,7 +388,7 @@ def seed_partial_responses(surveys):
     """Create test partial responses."""
     print("Creating partial responses...")
     
-    partials_created = 0
+    partials = []
     
     for survey in surveys[:2]:  # Only for first 2 surveys
         for i in range(3):
@@ -392,15 +404,16 @@ def seed_partial_responses(surveys):
                     elif field.field_type == FieldType.EMAIL:
                         partial_data[field_id] = f"partial{i}@example.com"
             
-            PartialResponse.objects.create(
+            partials.append(PartialResponse(
                 survey=survey,
-                session_token=f"test-session-{survey.id}-{i}",
+                session_token=uuid.uuid4(),
                 data=partial_data,
                 last_section_id=first_section.id if first_section else None
-            )
-            partials_created += 1
+            ))
+    
+    PartialResponse.objects.bulk_create(partials, batch_size=SEED_BATCH_SIZE)
     
-    print(f"Created {partials_created} partial responses")
+    print(f"Created {len(partials)} partial responses")
 
 
 def seed_all_data():